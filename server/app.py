@@ -16,10 +16,12 @@ from routes.collection import collection_bp
 from routes.backup import backup_bp
 
 # Import utilities
-from utils import setup_logging, create_directories, handle_error
+from utils import setup_logging, create_directories, handle_error, OrjsonProvider
+from services.mongo_service import mongo_service
 
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)  # jsonify, request.get_json and handle_error all go through orjson
     
     # Setup logging
     setup_logging()
@@ -91,6 +93,16 @@ def create_app():
         logging.error(f"Unhandled exception: {error}")
         return handle_error(error)
     
+    # A backup or restore can run for hours on a client it fetched once, so the clients a request uses stay
+    # leased, and safe from eviction, until the request (or its streamed response) is finished
+    @app.before_request
+    def lease_mongo_clients():
+        mongo_service.begin_client_leases()
+    
+    @app.teardown_request
+    def release_mongo_clients(error=None):
+        mongo_service.end_client_leases()
+    
     # Request logging middleware
     @app.before_request
     def log_request():
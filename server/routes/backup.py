@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, send_file
 from services.backup_service import backup_service
-from utils import require_json, validate_request_data, handle_error
+from utils import require_json, validate_request_data, handle_error, load_json_file, dump_json_file
 import logging
 import os
 from pathlib import Path
@@ -8,8 +8,6 @@ from werkzeug.utils import secure_filename
 import tempfile
 import zipfile
 from datetime import datetime
-import shutil 
-import json 
 import zipfile
 from pathlib import Path
 from datetime import datetime
@@ -125,7 +123,7 @@ def download_backup(backup_name):
                 'error': 'Backup not found',
                 'message': f'Backup "{backup_name}" does not exist',
                 'searched_path': str(backup_path),
-                'available_backups': [item.name for item in backup_dir.iterdir() if item.is_dir()] if backup_dir.exists() else []
+                'available_backups': [item.name for item in backup_dir.iterdir() if item.is_dir() and not backup_service.is_trash(item)] if backup_dir.exists() else []
             }), 404
         
         if backup_path.is_dir():
@@ -149,7 +147,9 @@ def download_backup(backup_name):
                     for file_path in backup_path.rglob('*'):
                         if file_path.is_file():
                             arcname = file_path.relative_to(backup_path)
-                            zipf.write(file_path, arcname)
+                            # Archives and dump files that are already compressed gain nothing from deflating again
+                            compress_type = zipfile.ZIP_STORED if file_path.suffix in ('.gz', '.zst') else zipfile.ZIP_DEFLATED
+                            zipf.write(file_path, arcname, compress_type=compress_type)
                             file_count += 1
                     
                     logger.info(f"Created ZIP file with {file_count} files")
@@ -214,10 +214,12 @@ def list_backup_files():
         
         files = []
         for item in backup_dir.iterdir():
+            # Skip trees that are still being deleted in the background
+            if backup_service.is_trash(item):
+                continue
             if item.is_dir():
-                # Get directory size
-                size = sum(f.stat().st_size for f in item.rglob('*') if f.is_file())
-                file_count = len([f for f in item.rglob('*') if f.is_file()])
+                # Get directory size and file count in one walk
+                size, file_count = backup_service.directory_stats(item)
                 
                 files.append({
                     'name': item.name,
@@ -264,16 +266,14 @@ def get_backup_info(backup_name):
             metadata = {}
             
             if metadata_file.exists():
-                import json
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
+                metadata = load_json_file(metadata_file)
             
             # Get backup size
             def get_size(path):
                 if path.is_file():
                     return path.stat().st_size
                 else:
-                    return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+                    return backup_service.directory_stats(path)[0]
             
             size = get_size(backup_path)
             
@@ -314,20 +314,23 @@ def get_backup_info(backup_name):
                             'type': 'bson'
                         })
                     
-                    # For python backups - look for .json files
+                    # For python backups - look for .ndjson/.ndjson.gz (current) or .json/.json.gz (older) files
                     if not collections_info:
-                        for json_file in db_backup_path.glob('*.json'):
-                            collection_name = json_file.stem
-                            collections_info.append({
-                                'name': collection_name,
-                                'size': json_file.stat().st_size,
-                                'type': 'json'
-                            })
+                        for file_type in ('ndjson', 'ndjson.gz', 'json', 'json.gz'):
+                            for json_file in db_backup_path.glob(f'*.{file_type}'):
+                                collections_info.append({
+                                    # Strip the whole suffix, so items.ndjson.gz is collection items, not items.ndjson
+                                    'name': json_file.name[:-len(file_type) - 1],
+                                    'size': json_file.stat().st_size,
+                                    'type': file_type
+                                })
             
             if collections_info:
                 backup_info['collections'] = collections_info
-            elif 'collections' in metadata:
-                backup_info['collections'] = metadata['collections']
+            else:
+                # Python backups record only a count under 'collections'; the client always expects a list
+                collections = metadata.get('collections')
+                backup_info['collections'] = collections if isinstance(collections, list) else []
             
             return jsonify({
                 'success': True,
@@ -347,7 +350,9 @@ def get_backup_info(backup_name):
 def list_database_backups():
     """List all backups stored in the backup database"""
     try:
-        result = backup_service.list_database_backups()
+        # Counts are estimated from collection metadata unless ?exact=true asks for a full count
+        exact = request.args.get('exact', 'false').lower() == 'true'
+        result = backup_service.list_database_backups(exact=exact)
         return jsonify(result), 200
         
     except Exception as e:
@@ -394,15 +399,13 @@ def validate_backup():
         if metadata_file.exists():
             validation_results['has_metadata'] = True
             try:
-                import json
-                with open(metadata_file, 'r') as f:
-                    json.load(f)
+                load_json_file(metadata_file)
             except Exception as e:
                 validation_results['issues'].append(f"Invalid metadata file: {str(e)}")
         
         # Check for data files
         if backup_path.is_dir():
-            data_files = list(backup_path.rglob('*.bson')) + list(backup_path.rglob('*.json'))
+            data_files = list(backup_path.rglob('*.bson')) + list(backup_path.rglob('*.json')) + list(backup_path.rglob('*.ndjson')) + list(backup_path.glob('*.archive*'))
             if data_files:
                 validation_results['has_data'] = True
             else:
@@ -430,7 +433,9 @@ def validate_backup():
 def get_backup_database_info():
     """Get information about the backup database"""
     try:
-        result = backup_service.get_backup_database_info()
+        # Counts are estimated from collection metadata unless ?exact=true asks for a full count
+        exact = request.args.get('exact', 'false').lower() == 'true'
+        result = backup_service.get_backup_database_info(exact=exact)
         return jsonify(result), 200
         
     except Exception as e:
@@ -515,8 +520,7 @@ def upload_backup():
         
         try:
             # Extract ZIP file
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(backup_path)
+            backup_service.extract_zip_archive(file_path, backup_path)
             
             logger.info(f"Extracted backup to: {backup_path}")
             
@@ -531,8 +535,7 @@ def upload_backup():
             # Search for metadata.json in extracted files
             for file_path_extracted in backup_path.rglob('metadata.json'):
                 try:
-                    with open(file_path_extracted, 'r') as f:
-                        metadata = json.load(f)
+                    metadata = load_json_file(file_path_extracted)
                     metadata_file = file_path_extracted
                     break
                 except:
@@ -562,8 +565,7 @@ def upload_backup():
                 
                 # Create metadata file
                 metadata_file = backup_path / 'metadata.json'
-                with open(metadata_file, 'w') as f:
-                    json.dump(metadata, f, indent=2)
+                dump_json_file(metadata_file, metadata)
             
             # Extract collection information from backup
             collections_info = []
@@ -585,15 +587,15 @@ def upload_backup():
                         break
                     
                     # Check for JSON files (custom format) - including compressed
-                    json_files = list(db_dir.glob('*.json')) + list(db_dir.glob('*.json.gz'))
+                    json_files = [f for pattern in ('*.json', '*.json.gz', '*.ndjson', '*.ndjson.gz') for f in db_dir.glob(pattern)]
                     if json_files:
                         for json_file in json_files:
                             if 'metadata.json' not in json_file.name:  # Skip metadata files
-                                # Handle both .json and .json.gz files
-                                if json_file.name.endswith('.json.gz'):
-                                    collection_name = json_file.name.replace('.json.gz', '')
+                                # Handle .json/.ndjson and their .gz variants
+                                if json_file.name.endswith('.gz'):
+                                    collection_name = json_file.name[:-len('.gz')].rsplit('.', 1)[0]
                                 else:
-                                    collection_name = json_file.stem  # Remove .json
+                                    collection_name = json_file.stem  # Remove .json/.ndjson
                                 collections_info.append(collection_name)
                         break
             
@@ -619,11 +621,17 @@ def upload_backup():
                                 collection_name = json_file.stem  # Remove .json
                             collections_info.append(collection_name)
             
+            # Archive backups keep their collections in one file, their metadata lists them instead
+            if not collections_info and isinstance(metadata.get('collections'), list):
+                collections_info = metadata['collections']
+            
             logger.info(f"Found collections: {collections_info}")
             
             # Clean up uploaded ZIP file
             file_path.unlink()
             
+            extracted_size, extracted_files_count = backup_service.directory_stats(backup_path)
+            
             return jsonify({
                 'success': True,
                 'message': 'Backup file uploaded and extracted successfully',
@@ -632,8 +640,8 @@ def upload_backup():
                 'backup_info': {
                     'database': metadata.get('database', 'unknown'),
                     'method': metadata.get('method', 'uploaded'),
-                    'size': sum(f.stat().st_size for f in backup_path.rglob('*') if f.is_file()),
-                    'files_count': len([f for f in backup_path.rglob('*') if f.is_file()]),
+                    'size': extracted_size,
+                    'files_count': extracted_files_count,
                     'created_at': metadata.get('created_at'),
                     'upload_timestamp': timestamp,
                     'collections': collections_info
@@ -645,7 +653,7 @@ def upload_backup():
             if file_path.exists():
                 file_path.unlink()
             if backup_path.exists():
-                shutil.rmtree(backup_path, ignore_errors=True)
+                backup_service.discard_tree(backup_path)
             
             return jsonify({
                 'success': False,
@@ -658,7 +666,7 @@ def upload_backup():
             if file_path.exists():
                 file_path.unlink()
             if backup_path.exists():
-                shutil.rmtree(backup_path, ignore_errors=True)
+                backup_service.discard_tree(backup_path)
             
             logger.error(f"Failed to extract backup: {extract_error}")
             return jsonify({
@@ -680,17 +688,16 @@ def list_uploaded_backups():
         uploaded_backups = []
         
         for backup_path in backup_dir.iterdir():
-            if backup_path.is_dir() and backup_path.name.startswith('uploaded_'):
+            if backup_path.is_dir() and backup_path.name.startswith('uploaded_') and not backup_service.is_trash(backup_path):
                 # Load metadata
                 metadata_file = backup_path / 'metadata.json'
                 metadata = {}
                 
                 if metadata_file.exists():
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
+                    metadata = load_json_file(metadata_file)
                 
                 # Get backup size
-                size = sum(f.stat().st_size for f in backup_path.rglob('*') if f.is_file())
+                size = backup_service.directory_stats(backup_path)[0]
                 
                 uploaded_backups.append({
                     'name': backup_path.name,
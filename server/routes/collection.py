@@ -1,7 +1,8 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from services.collection_service import collection_service
-from utils import require_json, validate_request_data, handle_error
+from utils import require_json, validate_request_data, handle_error, stream_json_listing
 import logging
+import itertools
 
 collection_bp = Blueprint('collection', __name__)
 logger = logging.getLogger(__name__)
@@ -15,9 +16,13 @@ def list_collections():
         data = request.get_json()
         connection_string = data['connection_string']
         database_name = data['database_name']
-        print(data)
         result = collection_service.list_collections(connection_string, database_name)
-        return jsonify(result), 200
+        # Stream the collections as their stats come in rather than building the whole response first; the first
+        # entry is pulled here so a failure before any output still gets an error response from handle_error
+        collections = result.pop('collections')
+        first = list(itertools.islice(collections, 1))
+        listing = stream_json_listing(result, 'collections', itertools.chain(first, collections))
+        return Response(stream_with_context(listing), mimetype='application/json'), 200
         
     except Exception as e:
         return handle_error(e)
@@ -198,17 +203,17 @@ def count_documents():
         if not is_valid:
             raise ValueError(message)
         
-        with mongo_service.get_client(connection_string) as client:
-            collection = client[database_name][collection_name]
-            count = collection.count_documents(query)
-            
-            return jsonify({
-                'success': True,
-                'database': database_name,
-                'collection': collection_name,
-                'count': count,
-                'query': query
-            }), 200
+        client = mongo_service.get_client(connection_string)
+        collection = client[database_name][collection_name]
+        count = collection.count_documents(query)
+        
+        return jsonify({
+            'success': True,
+            'database': database_name,
+            'collection': collection_name,
+            'count': count,
+            'query': query
+        }), 200
         
     except Exception as e:
         return handle_error(e)
\ No newline at end of file
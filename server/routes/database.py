@@ -29,8 +29,9 @@ def list_databases():
     try:
         data = request.get_json()
         connection_string = data['connection_string']
+        include_stats = data.get('include_stats', True)  # False skips the per-database dbStats calls
         
-        result = database_service.list_databases(connection_string)
+        result = database_service.list_databases(connection_string, bool(include_stats))
         return jsonify(result), 200
         
     except Exception as e:
@@ -1,14 +1,58 @@
 import os
 import subprocess
 import logging
+import threading
+import time
 import shutil
+import signal
+import re
 from pathlib import Path
-from bson import ObjectId
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import bson
+from bson import ObjectId, json_util
+from bson.codec_options import CodecOptions, DEFAULT_CODEC_OPTIONS
+from bson.raw_bson import RawBSONDocument
+from datetime import datetime, timezone
+import io
+import itertools
 import json
+import gzip
+import mmap
+import sqlite3
+from contextlib import closing, contextmanager
+import tempfile
 import zipfile
+import ijson
+import orjson
+from pymongo import CursorType, IndexModel, InsertOne, ReplaceOne
+from pymongo.write_concern import WriteConcern
+from pymongo.topology_description import TOPOLOGY_TYPE
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
 from .mongo_service import mongo_service
-from utils import validate_database_name, validate_connection_string, get_backup_filename, sanitize_filename, format_bytes
+from .database_service import database_service
+from utils import validate_database_name, validate_connection_string, get_backup_filename, sanitize_filename, format_bytes, load_json_file, dump_json_file, connection_string_key
+
+# Buffer size for backup file I/O; large enough that per-document reads and writes coalesce into few syscalls
+FILE_BUFFER_SIZE = 1 << 20
+
+# JSON backup files above this size are memory-mapped instead of read through a buffer
+MMAP_THRESHOLD_BYTES = 100 * 1024 * 1024
+# Bare NaN/Infinity values, which json.dump wrote for non-finite doubles in older backups and which ijson and orjson reject
+NON_FINITE_JSON_VALUE = re.compile(rb'[\[:,]\s*-?(?:NaN|Infinity)\b')
+# JSON files below this size are parsed in one orjson call, which beats incremental parsing by a wide margin
+FULL_PARSE_THRESHOLD_BYTES = 16 * 1024 * 1024
+
+# Collection in backup_db that maps backup identifiers to their backup collections
+BACKUP_INDEX_COLLECTION = 'backup_index'
+SYSTEM_COLLECTION_PREFIX = 'system.'
+SYSTEM_COLLECTION_REGEX = '^system\\.'
+
+# Command prefix _background_priority puts in front of backup tools
+BACKGROUND_PRIORITY_PREFIX = ['ionice', '-c2', '-n7', '-t', 'nice', '-n10']
+
+# discard_tree renames a tree to .<name><TRASH_MARKER><timestamp> before deleting it in the background
+TRASH_MARKER = '.deleting-'
 
 class BackupService:
     def __init__(self):
@@ -17,9 +61,35 @@ class BackupService:
         self.temp_dir = Path(os.getenv('TEMP_DIRECTORY', './temp'))
         self.max_backup_size = int(os.getenv('MAX_BACKUP_SIZE', 1073741824))  # 1GB default
         self.backup_db_connection = os.getenv('BACKUP_DB_CONNECTION_STRING', 'mongodb://localhost:27017')
+        self.batch_size = int(os.getenv('BACKUP_BATCH_SIZE', 1000))  # Documents per cursor batch / insert_many call
+        # The backup is the source of truth during a restore, so skip waiting on majority/journal acknowledgement
+        # while still hearing about write errors
+        self.restore_write_concern = WriteConcern(w=1, j=False)
+        self.restore_batch_size = int(os.getenv('RESTORE_BATCH_SIZE', 10000))  # Documents per restore insert_many/bulk_write call
+        self.max_batch_bytes = 12 * 1024 * 1024  # Keep insert_many payloads well under the 16MB BSON message limit
+        self.max_restore_memory = int(os.getenv('MAX_RESTORE_MEMORY', 500 * 1024 * 1024))  # Byte budget for one buffered restore batch
+        self.max_workers = int(os.getenv('BACKUP_MAX_WORKERS', 16))  # Upper bound for per-collection worker threads
+        self.insert_workers = int(os.getenv('BACKUP_INSERT_WORKERS', 4))  # Concurrent insert_many calls per collection
+        self._size_cache = {}  # Backup directory -> (mtime, size in bytes)
+        self._backup_collections_cache = None  # (monotonic timestamp, backup_db collection names)
+        self._backup_index_ready = set()  # connection_string_key of each backup deployment whose backup_index lookup index this process ensured
+        self.collection_names_ttl = 5  # Seconds a backup_db collection listing stays fresh
+        self.catalog_path = self.backup_dir / 'backups.db'  # SQLite cache of list_backups entries
+        self._listing_cache = None  # In-memory copy of the catalog, loaded from SQLite on the first listing
+        self._config_file_support = {}  # Tool name -> whether its --version is new enough for --config
+        self._listing_cache_lock = threading.Lock()
+        self.python_backup_format = os.getenv('PYTHON_BACKUP_FORMAT', 'bson')  # 'bson' (raw, type-faithful), 'ndjson' or 'ndjson.gz'
+        self.ndjson_gzip_level = int(os.getenv('NDJSON_GZIP_LEVEL', 6))  # compresslevel for 'ndjson.gz' backups
+        self.dump_parallel_collections = int(os.getenv('MONGODUMP_PARALLEL', 8))  # Collections mongodump reads at once
+        self.restore_parallel_collections = int(os.getenv('MONGORESTORE_PARALLEL_COLLECTIONS', os.getenv('MONGORESTORE_PARALLEL', min(8, os.cpu_count() or 1))))
+        self.restore_insertion_workers = int(os.getenv('MONGORESTORE_INSERTION_WORKERS', 4))  # Insert workers per collection
+        self.restore_concurrency = int(os.getenv('RESTORE_CONCURRENCY', 4))  # Per-collection mongorestore processes run at once
+        self.low_priority_io = os.getenv('BACKUP_LOW_PRIORITY_IO', 'true').lower() == 'true'  # ionice/nice dumps, keep backup files out of the page cache
         # Ensure directories exist
         self.backup_dir.mkdir(parents=True, exist_ok=True)
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self._init_catalog()
+        self._sweep_trash()
     
     def create_backup(self, connection_string, database_name, backup_name=None, options=None):
         """Create a backup of a MongoDB database using mongodump and/or database storage"""
@@ -90,24 +160,11 @@ class BackupService:
             if 'database' in results:
                 combined_result['backup']['database_backup'] = results['database']['backup']
             
-            # Sanitize all Path objects for JSON serialization
-            return self._sanitize_for_json(combined_result)
+            return combined_result
             
         except Exception as e:
             self.logger.error(f"Failed to create backup: {e}")
             raise
-    def _sanitize_for_json(self, obj):
-        """Recursively convert Path objects to strings for JSON serialization"""
-        from pathlib import Path
-        
-        if isinstance(obj, Path):
-            return str(obj)
-        elif isinstance(obj, dict):
-            return {key: self._sanitize_for_json(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [self._sanitize_for_json(item) for item in obj]
-        else:
-            return obj
     
     def _create_database_backup(self, connection_string, database_name, backup_filename, backup_db_connection, options=None):
         """Create a backup by storing data directly in a MongoDB database"""
@@ -115,92 +172,265 @@ class BackupService:
             self.logger.info(f"Creating database backup for {database_name} with backup name {backup_filename}")
             
             # Connect to source database
-            with mongo_service.get_client(connection_string) as source_client:
-                source_db = source_client[database_name]
-                collection_names = source_db.list_collection_names()
+            source_client = mongo_service.get_bulk_client(connection_string)
+            source_db = source_client[database_name]
+            user_collections = self._list_user_collection_names(source_db)
+            
+            # Connect to backup database
+            backup_client = mongo_service.get_bulk_client(backup_db_connection)
+            backup_db = backup_client['backup_db']
+            
+            # Create a unique collection name for this backup
+            backup_collection_name = f"backup_{backup_filename}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+            backup_collection = backup_db[backup_collection_name]
+            # Fast mode streams the data unacknowledged; the metadata document below is still acknowledged
+            data_collection = backup_collection
+            fast_insert = bool(options and options.get('fast_insert'))
+            if fast_insert:
+                data_collection = backup_collection.with_options(write_concern=WriteConcern(w=0))
+            
+            total_documents = 0
+            collections_backed_up = []
+            
+            # Every document in one run shares the same logical backup time
+            backup_timestamp = datetime.utcnow().isoformat()
+            
+            # Lets restores stream each original collection with an index range scan,
+            # and lets server-side copies count their documents without a collection scan;
+            # built here, while the new backup collection is still empty, so it costs nothing
+            backup_collection.create_index('original_collection')
+            
+            # Source and backup on the same deployment can be copied entirely server-side
+            server_side_copy = connection_string == backup_db_connection
+            
+            # Collections are independent; copy them concurrently (pymongo releases the GIL on network I/O)
+            if user_collections:
+                collection_workers, writer_workers = self._nested_worker_counts(len(user_collections))
+                with ThreadPoolExecutor(max_workers=collection_workers) as executor:
+                    document_counts = list(executor.map(
+                        lambda name: self._backup_collection_to_database(
+                            source_db[name], data_collection, backup_timestamp, server_side_copy, writer_workers
+                        ),
+                        user_collections
+                    ))
                 
-                # Connect to backup database
-                with mongo_service.get_client(backup_db_connection) as backup_client:
-                    backup_db = backup_client['backup_db']
-                    
-                    # Create a unique collection name for this backup
-                    backup_collection_name = f"backup_{backup_filename}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
-                    backup_collection = backup_db[backup_collection_name]
-                    
-                    total_documents = 0
-                    collections_backed_up = []
-                    
-                    # Backup each collection (skip system collections)
-                    for collection_name in collection_names:
-                        if collection_name.startswith('system.'):
-                            self.logger.info(f"Skipping system collection: {collection_name}")
-                            continue
-                        
-                        source_collection = source_db[collection_name]
-                        document_count = 0
-                        
-                        # Read all documents from source collection
-                        for document in source_collection.find():
-                            # Store the document with metadata about its original collection
-                            backup_doc = {
-                                'original_collection': collection_name,
-                                'original_id': str(document.get('_id')),  # Store original _id as string
-                                'data': document,
-                                'backup_timestamp': datetime.utcnow().isoformat()
-                            }
-                            
-                            # Remove _id from data to avoid conflicts
-                            if '_id' in backup_doc['data']:
-                                del backup_doc['data']['_id']
-                            
-                            backup_collection.insert_one(backup_doc)
-                            document_count += 1
-                            total_documents += 1
-                        
-                        collections_backed_up.append({
-                            'name': collection_name,
-                            'document_count': document_count
-                        })
-                        
-                        self.logger.info(f"Backed up collection {collection_name} ({document_count} documents)")
-                    
-                    # Create metadata document
-                    metadata = {
-                        'backup_identifier': backup_filename,
-                        'source_database': database_name,
-                        'backup_timestamp': datetime.utcnow().isoformat(),
-                        'backup_method': 'database_storage',
-                        'total_documents': total_documents,
-                        'collections_backed_up': collections_backed_up,
-                        'backup_collection_name': backup_collection_name
-                    }
-                    
-                    # Insert metadata as a special document
-                    backup_collection.insert_one({
-                        '_id': 'BACKUP_METADATA',
-                        'metadata': metadata
+                for collection_name, document_count in zip(user_collections, document_counts):
+                    collections_backed_up.append({
+                        'name': collection_name,
+                        'document_count': document_count
                     })
-                    
-                    self.logger.info(f"Successfully created database backup {backup_filename} with {total_documents} documents")
-                    
-                    return {
-                        'success': True,
-                        'message': 'Database backup created successfully',
-                        'backup': {
-                            'name': backup_filename,
-                            'database': database_name,
-                            'collection_name': backup_collection_name,
-                            'total_documents': total_documents,
-                            'collections_backed_up': len(collections_backed_up),
-                            'created_at': metadata['backup_timestamp'],
-                            'method': 'database_storage'
-                        }
-                    }
-                    
+                    total_documents += document_count
+            
+            if fast_insert:
+                # Unacknowledged inserts may still be in flight and their failures are never reported. The server applies
+                # a connection's messages in order, so an acknowledged command waits for the writes sent ahead of it on
+                # its (most recently used) pooled connection before the backup is registered. Writes on other connections
+                # are not covered, so the counts are documents sent, not documents known to be stored
+                backup_db.command('ping')
+            
+            # Create metadata document
+            metadata = {
+                'backup_identifier': backup_filename,
+                'source_database': database_name,
+                'backup_timestamp': datetime.utcnow().isoformat(),
+                'backup_method': 'database_storage',
+                'total_documents': total_documents,
+                'document_counts_verified': not fast_insert,
+                'collections_backed_up': collections_backed_up,
+                'backup_collection_name': backup_collection_name
+            }
+            
+            # Insert metadata as a special document
+            backup_collection.insert_one({
+                '_id': 'BACKUP_METADATA',
+                'metadata': metadata
+            })
+            
+            # Register the backup so lookups don't have to probe every collection
+            backup_index = backup_db[BACKUP_INDEX_COLLECTION]
+            backup_deployment = connection_string_key(backup_db_connection)
+            if backup_deployment not in self._backup_index_ready:
+                # Serves identifier lookups and their newest-first tie-break in one index
+                backup_index.create_index([('backup_identifier', 1), ('created_at', -1)])
+                self._backup_index_ready.add(backup_deployment)
+            self._backup_collections_cache = None
+            backup_index.insert_one({
+                '_id': backup_collection_name,
+                'backup_identifier': backup_filename,
+                'source_database': database_name,
+                'created_at': metadata['backup_timestamp'],
+                'metadata': metadata
+            })
+            
+            if fast_insert:
+                self.logger.info(f"Created database backup {backup_filename} with {total_documents} documents sent unacknowledged (not verified)")
+            else:
+                self.logger.info(f"Successfully created database backup {backup_filename} with {total_documents} documents")
+            
+            return {
+                'success': True,
+                'message': 'Database backup created successfully',
+                'backup': {
+                    'name': backup_filename,
+                    'database': database_name,
+                    'collection_name': backup_collection_name,
+                    'total_documents': total_documents,
+                    'document_counts_verified': not fast_insert,
+                    'collections_backed_up': len(collections_backed_up),
+                    'created_at': metadata['backup_timestamp'],
+                    'method': 'database_storage'
+                }
+            }
+            
         except Exception as e:
             self.logger.error(f"Failed to create database backup: {e}")
             raise
        
+    def _backup_collection_to_database(self, source_collection, data_collection, backup_timestamp, server_side_copy=False, writer_workers=None):
+        """Copy one source collection into a backup collection, returning the number of documents copied"""
+        collection_name = source_collection.name
+        if server_side_copy:
+            try:
+                document_count = self._merge_collection_on_server(source_collection, data_collection, backup_timestamp)
+                self.logger.info(f"Backed up collection {collection_name} server-side ({document_count} documents)")
+                return document_count
+            except PyMongoError as e:
+                if e.timeout:
+                    # The $merge may have written part of the collection or still be finishing on the server;
+                    # streaming the same documents in alongside it would race it, so fail this backup instead
+                    raise Exception(f"Server-side copy of {collection_name} timed out and may still be running on the server: {e}") from e
+                if not isinstance(e, OperationFailure):
+                    raise
+                # $merge needs MongoDB 4.2+; fall back to streaming through this process
+                self.logger.info(f"Server-side copy unavailable for {collection_name}, streaming instead: {e}")
+                data_collection.with_options(write_concern=WriteConcern()).delete_many({'original_collection': collection_name})
+        
+        try:
+            document_count = self._insert_in_batches(
+                data_collection, self._server_shaped_backup_documents(source_collection, backup_timestamp), writer_workers
+            )
+        except BulkWriteError:
+            raise
+        except OperationFailure as e:
+            # Pre-4.2 servers lack $unset, and $toString rejects some _id types; redo this collection client-side
+            self.logger.info(f"Server-side shaping unavailable for {collection_name}, copying client-side: {e}")
+            data_collection.with_options(write_concern=WriteConcern()).delete_many({'original_collection': collection_name})
+            document_count = self._insert_in_batches(
+                data_collection, self._client_shaped_backup_documents(source_collection, backup_timestamp), writer_workers
+            )
+        
+        self.logger.info(f"Backed up collection {collection_name} ({document_count} documents)")
+        return document_count
+    
+    def _backup_shaping_pipeline(self, collection_name, backup_timestamp):
+        """Aggregation stages that wrap each source document in the stored backup document shape"""
+        return [
+            {'$project': {
+                '_id': 0,
+                'original_collection': {'$literal': collection_name},
+                'original_id': {'$toString': '$_id'},  # Store original _id as string
+                'data': '$$ROOT',
+                'backup_timestamp': {'$literal': backup_timestamp}
+            }},
+            # Remove _id from data to avoid conflicts
+            {'$unset': 'data._id'}
+        ]
+    
+    def _merge_collection_on_server(self, source_collection, data_collection, backup_timestamp):
+        """Copy a collection into the backup collection with $merge, so no document passes through this process"""
+        pipeline = self._backup_shaping_pipeline(source_collection.name, backup_timestamp) + [
+            {'$merge': {
+                'into': {'db': data_collection.database.name, 'coll': data_collection.name},
+                'whenMatched': 'keepExisting',
+                'whenNotMatched': 'insert'
+            }}
+        ]
+        # $merge produces no output documents; the command returns once the copy is done, which on a large
+        # collection takes far longer than the client's socket timeout
+        with mongo_service.long_operation():
+            source_collection.aggregate(pipeline, allowDiskUse=True).close()
+        return data_collection.count_documents({'original_collection': source_collection.name})
+    
+    def _server_shaped_backup_documents(self, source_collection, backup_timestamp):
+        """Yield backup documents shaped by an aggregation on the server, as undecoded raw BSON"""
+        pipeline = self._backup_shaping_pipeline(source_collection.name, backup_timestamp)
+        raw_source = source_collection.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+        with raw_source.aggregate(pipeline, batchSize=self.batch_size, allowDiskUse=True) as cursor:
+            yield from cursor
+    
+    def _client_shaped_backup_documents(self, source_collection, backup_timestamp):
+        """Yield backup documents wrapped in Python from a plain find()"""
+        # Read all documents from source collection in large batches to cut getMore round-trips;
+        # closing the no-timeout cursor explicitly keeps it from lingering on the server
+        with source_collection.find({}, no_cursor_timeout=True, batch_size=self.batch_size) as cursor:
+            for document in cursor:
+                # Store the document with metadata about its original collection
+                backup_doc = {
+                    'original_collection': source_collection.name,
+                    'original_id': str(document.get('_id')),  # Store original _id as string
+                    'data': document,
+                    'backup_timestamp': backup_timestamp
+                }
+                
+                # Remove _id from data to avoid conflicts
+                if '_id' in backup_doc['data']:
+                    del backup_doc['data']['_id']
+                
+                yield backup_doc
+    
+    def _insert_in_batches(self, collection, documents, writer_workers=None):
+        """insert_many documents in batches bounded by count and encoded size, returning how many were written"""
+        writer_workers = writer_workers or self.insert_workers
+        document_count = 0
+        failed_count = 0
+        batch = []
+        batch_bytes = 0
+        
+        # Writer threads insert while this thread keeps reading the source cursor; a bounded number of
+        # pending batches keeps memory flat when the reader is faster than the writers
+        pending = deque()
+        max_pending = writer_workers * 2
+        
+        def insert_batch(full_batch):
+            try:
+                collection.insert_many(full_batch, ordered=False)
+                return 0
+            except BulkWriteError as e:
+                # Unordered inserts carry on past a bad document; count what was dropped instead of failing the batch
+                write_errors = e.details.get('writeErrors', [])
+                self.logger.warning(f"{e.details.get('nInserted', 0)}/{len(full_batch)} documents inserted into "
+                                    f"{collection.name}: {write_errors[:1]}")
+                return len(full_batch) - e.details.get('nInserted', 0)
+        
+        with ThreadPoolExecutor(max_workers=writer_workers) as executor:
+            def flush(full_batch):
+                nonlocal failed_count
+                if len(pending) >= max_pending:
+                    failed_count += pending.popleft().result()
+                pending.append(executor.submit(insert_batch, full_batch))
+            
+            for doc in documents:
+                # Flush by encoded size as well as count so wide documents never exceed the wire limit
+                doc = self._raw_document(doc, collection.codec_options)
+                doc_bytes = len(doc.raw)
+                if batch and (batch_bytes + doc_bytes > self.max_batch_bytes or len(batch) >= self.batch_size):
+                    flush(batch)
+                    batch = []
+                    batch_bytes = 0
+                
+                batch.append(doc)
+                batch_bytes += doc_bytes
+                document_count += 1
+            
+            if batch:
+                flush(batch)
+            
+            # Surface any insert failure before reporting the collection as copied
+            while pending:
+                failed_count += pending.popleft().result()
+        
+        return document_count - failed_count
+        
     def _create_file_system_backup(self, connection_string, database_name, backup_name=None, options=None):
         """Create a backup of a MongoDB database using mongodump with clean filename"""
         # Validate inputs
@@ -231,18 +461,25 @@ class BackupService:
                 # Fallback to Python-based backup
                 return self._create_python_backup(connection_string, database_name, backup_path)
             
+            # Archive mode (the default) streams the whole dump into a single compressed file
+            # instead of writing raw BSON per collection; pass archive=False for a directory dump
+            use_archive = not options or options.get('archive', True)
+            
             # Prepare mongodump command
             cmd = [
                 'mongodump',
                 '--uri', connection_string,
-                '--db', database_name,
-                '--out', str(backup_path)
+                '--db', database_name
             ]
+            if use_archive:
+                cmd.append('--archive')
+            else:
+                cmd.extend(['--out', str(backup_path)])
             
             # Add additional options if provided
             specific_collections_requested = False
             if options:
-                if options.get('gzip'):
+                if options.get('gzip') and not use_archive:
                     cmd.append('--gzip')
                 if options.get('collection'):
                     cmd.extend(['--collection', options['collection']])
@@ -259,17 +496,45 @@ class BackupService:
             # mongodump doesn't allow --collection and --excludeCollection together
             if not specific_collections_requested:
                 cmd.extend(['--excludeCollection', 'system.*'])
+                # Dump several collections at once; mongodump defaults to 4
+                parallel_collections = options.get('parallel_collections') if options else None
+                cmd.append(f'--numParallelCollections={int(parallel_collections or self.dump_parallel_collections)}')
             
             self.logger.info(f"Starting backup of database {database_name}")
             
-            # Execute mongodump
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                raise Exception(f"mongodump failed: {result.stderr}")
-            
-            # Get backup size
-            backup_size = self._get_directory_size(backup_path)
+            archive_info = {}
+            if use_archive:
+                # options.compression picks 'zstd' or 'gzip' explicitly; the legacy gzip flag means gzip
+                preference = None
+                level = None
+                if options:
+                    preference = options.get('compression') or ('gzip' if options.get('gzip') else None)
+                    level = int(options['compression_level']) if options.get('compression_level') else None
+                compressor, archive_ext, compression = self._select_archive_compressor(preference, level)
+                if compressor is None:
+                    # No external compressor available, let mongodump gzip the archive blocks itself
+                    cmd.append('--gzip')
+                
+                backup_path.mkdir(parents=True, exist_ok=True)
+                archive_path = backup_path / f"{database_name}{archive_ext}"
+                self._run_archive_dump(cmd, compressor, archive_path)
+                
+                backup_size = archive_path.stat().st_size
+                archive_info = {
+                    'archive_file': archive_path.name,
+                    'archive_compression': compression,
+                    # The archive has no per-collection files, so record what it contains for selective restores
+                    'collections': self._archived_collection_names(connection_string, database_name, options)
+                }
+            else:
+                # Execute mongodump
+                result = self._run_streaming(self._background_priority(cmd))
+                
+                if result.returncode != 0:
+                    raise Exception(f"mongodump failed: {result.stderr}")
+                
+                # Get backup size
+                backup_size = self._get_directory_size(backup_path)
             
             # Create metadata file
             metadata = {
@@ -278,12 +543,14 @@ class BackupService:
                 'created_at': datetime.utcnow().isoformat(),
                 'size': backup_size,
                 'method': 'mongodump',
-                'options': options or {}
+                'options': options or {},
+                **archive_info
             }
             
             metadata_file = backup_path / 'metadata.json'
-            with open(metadata_file, 'w') as f:
-                json.dump(metadata, f, indent=2)
+            dump_json_file(metadata_file, metadata)
+            self._catalog_record(backup_path, metadata, backup_size + metadata_file.stat().st_size)
+            
             
             self.logger.info(f"Successfully created backup {backup_filename}")
             
@@ -299,14 +566,89 @@ class BackupService:
                     'method': 'mongodump'
                 }
             }
-            return self._sanitize_for_json(result)
+            return result
                             
         except Exception as e:
             self.logger.error(f"Failed to create backup: {e}")
             # Clean up partial backup
             if 'backup_path' in locals() and backup_path.exists():
-                shutil.rmtree(backup_path, ignore_errors=True)
+                self.discard_tree(backup_path)
             raise
+    def _archived_collection_names(self, connection_string, database_name, options=None):
+        """Names of the collections a mongodump archive of this database includes"""
+        if options and (options.get('collection') or options.get('collections')):
+            requested = list(options.get('collections') or [])
+            if options.get('collection'):
+                requested.append(options['collection'])
+            return requested
+        
+        try:
+            client = mongo_service.get_bulk_client(connection_string)
+            return self._list_user_collection_names(client[database_name])
+        except Exception as e:
+            self.logger.warning(f"Could not list collections for archive metadata: {e}")
+            return []
+    
+    def _select_archive_compressor(self, preference=None, level=None):
+        """Pick the stream compressor for mongodump archive output, fastest available unless one is requested"""
+        # zstd at low levels compresses several times faster than DEFLATE at a similar ratio
+        if preference in (None, 'zstd') and shutil.which('zstd'):
+            return ['zstd', f'-{level or 1}', '-T0', '-q'], '.archive.zst', 'zstd'
+        if preference == 'zstd':
+            self.logger.warning("zstd is not installed, falling back to gzip for the backup archive")
+        if shutil.which('pigz'):
+            return ['pigz', f'-{level or 1}', '-p', str(os.cpu_count() or 1)], '.archive.gz', 'gzip'
+        # mongodump --gzip compresses each block inside the archive, not the whole stream
+        return None, '.archive.gz', 'mongodump'
+    
+    def _run_archive_dump(self, cmd, compressor, archive_path):
+        """Run mongodump --archive, piping its output through the compressor into archive_path"""
+        with open(archive_path, 'wb') as archive_file, tempfile.TemporaryFile(dir=self.temp_dir) as dump_stderr, \
+                self._uri_config(cmd) as cmd:
+            if compressor is None:
+                dump = subprocess.Popen(self._background_priority(cmd), stdout=archive_file, stderr=dump_stderr)
+                dump.wait()
+            else:
+                dump = subprocess.Popen(self._background_priority(cmd), stdout=subprocess.PIPE, stderr=dump_stderr)
+                compress = subprocess.Popen(self._background_priority(compressor), stdin=dump.stdout, stdout=archive_file)
+                dump.stdout.close()  # The compressor owns the read end now
+                compress.wait()
+                dump.wait()
+                if compress.returncode != 0:
+                    raise Exception(f"{compressor[0]} failed with exit code {compress.returncode}")
+            
+            if dump.returncode != 0:
+                dump_stderr.seek(0)
+                raise Exception(f"mongodump failed: {dump_stderr.read().decode(errors='replace')}")
+            self._release_page_cache(archive_file)
+    
+    def _background_priority(self, cmd):
+        """Prefix a backup tool's command with ionice/nice so its disk and CPU use yield to other work"""
+        if self.low_priority_io and shutil.which('ionice') and shutil.which('nice'):
+            # Best-effort class, lowest priority within it; the dump still gets idle bandwidth at full speed.
+            # -t runs the command anyway where ioprio_set is denied (e.g. unprivileged containers)
+            return BACKGROUND_PRIORITY_PREFIX + cmd
+        return cmd
+    
+    def _tool_name(self, cmd):
+        """The program a command runs, looking past the ionice/nice prefix _background_priority adds"""
+        if cmd[:len(BACKGROUND_PRIORITY_PREFIX)] == BACKGROUND_PRIORITY_PREFIX:
+            cmd = cmd[len(BACKGROUND_PRIORITY_PREFIX):]
+        return Path(cmd[0]).name
+    
+    def _release_page_cache(self, f):
+        """Flush a finished backup file and ask the kernel to drop its pages from the cache"""
+        # Backup files are written once and rarely read back soon, so caching them only evicts hotter data;
+        # DONTNEED skips dirty pages, hence the fdatasync first
+        if not self.low_priority_io or not hasattr(os, 'posix_fadvise'):
+            return
+        try:
+            f.flush()
+            os.fdatasync(f.fileno())
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError as e:
+            self.logger.debug(f"Could not release page cache for {f.name}: {e}")
+    
     def _create_python_backup(self, connection_string, database_name, backup_path):
         """Create backup using Python MongoDB driver with clean filename"""
         self.logger.info(f"Using Python-based backup for database {database_name}")
@@ -332,75 +674,158 @@ class BackupService:
             db_backup_path = backup_path / database_name
             db_backup_path.mkdir(parents=True, exist_ok=True)
             
-            with mongo_service.get_client(connection_string) as client:
-                db = client[database_name]
-                collection_names = db.list_collection_names()
-                
-                total_size = 0
-                
-                # Backup each collection (skip system collections)
-                for collection_name in collection_names:
-                    # Skip system collections
-                    if collection_name.startswith('system.'):
-                        self.logger.info(f"Skipping system collection: {collection_name}")
-                        continue
-                    
-                    collection = db[collection_name]
-                    collection_file = db_backup_path / f"{collection_name}.json"
-                    
-                    documents = list(collection.find())
-                    
-                    # Convert ObjectId to string for JSON serialization
-                    for doc in documents:
-                        if '_id' in doc:
-                            doc['_id'] = str(doc['_id'])
-                    
-                    with open(collection_file, 'w') as f:
-                        json.dump(documents, f, indent=2, default=str)
-                    
-                    total_size += collection_file.stat().st_size
-                    self.logger.info(f"Backed up collection {collection_name} ({len(documents)} documents)")
-                
-                # Create metadata
-                metadata = {
+            client = mongo_service.get_bulk_client(connection_string)
+            db = client[database_name]
+            user_collections = self._list_user_collection_names(db)
+            
+            total_size = 0
+            
+            if self.python_backup_format in ('ndjson', 'ndjson.gz'):
+                backup_format = self.python_backup_format
+                compress = backup_format == 'ndjson.gz'
+                backup_collection = lambda db, name, path: self._backup_collection_to_ndjson(db, name, path, compress)
+            else:
+                backup_format, backup_collection = 'bson', self._backup_collection_to_bson
+            
+            # Backup each user collection, several at a time
+            if user_collections:
+                with ThreadPoolExecutor(max_workers=self._collection_worker_count(len(user_collections))) as executor:
+                    total_size = sum(executor.map(
+                        lambda name: backup_collection(db, name, db_backup_path),
+                        user_collections
+                    ))
+            
+            # Create metadata
+            metadata = {
+                'database': database_name,
+                'backup_name': backup_path.name,  # Use the clean directory name
+                'created_at': datetime.utcnow().isoformat(),
+                'size': total_size,
+                'method': 'python',
+                'format': backup_format,
+                'collections': len(user_collections)
+            }
+            
+            metadata_file = backup_path / 'metadata.json'
+            dump_json_file(metadata_file, metadata)
+            self._catalog_record(backup_path, metadata, total_size + metadata_file.stat().st_size)
+            
+            result = {
+                'success': True,
+                'message': 'Backup created successfully (Python method)',
+                'backup': {
+                    'name': backup_path.name,  # Return the clean directory name (key fix!)
+                    'path': str(backup_path),
                     'database': database_name,
-                    'backup_name': backup_path.name,  # Use the clean directory name
-                    'created_at': datetime.utcnow().isoformat(),
                     'size': total_size,
-                    'method': 'python',
-                    'collections': len([name for name in collection_names if not name.startswith('system.')])
-                }
-                
-                metadata_file = backup_path / 'metadata.json'
-                with open(metadata_file, 'w') as f:
-                    json.dump(metadata, f, indent=2)
-                
-                result = {
-                    'success': True,
-                    'message': 'Backup created successfully (Python method)',
-                    'backup': {
-                        'name': backup_path.name,  # Return the clean directory name (key fix!)
-                        'path': str(backup_path),
-                        'database': database_name,
-                        'size': total_size,
-                        'created_at': metadata['created_at'],
-                        'method': 'python'
-                    }
+                    'created_at': metadata['created_at'],
+                    'method': 'python'
                 }
-                return self._sanitize_for_json(result)
-                
+            }
+            return result
+            
         except Exception as e:
             self.logger.error(f"Python backup failed: {e}")
             if backup_path and backup_path.exists():
-                shutil.rmtree(backup_path, ignore_errors=True)
+                self.discard_tree(backup_path)
             raise
+    def _backup_collection_to_bson(self, db, collection_name, db_backup_path):
+        """Write one collection's raw BSON documents to <name>.bson, returning the file size in bytes"""
+        collection_file = db_backup_path / f"{collection_name}.bson"
+        # Raw documents skip decoding into Python objects and keep every BSON type intact; each one
+        # is already length-prefixed, so concatenating them gives the same layout mongodump writes
+        collection = db.get_collection(collection_name, codec_options=CodecOptions(document_class=RawBSONDocument))
+        
+        document_count = 0
+        with self._dump_cursor(collection) as cursor, \
+                open(collection_file, 'wb', buffering=FILE_BUFFER_SIZE) as f:
+            for doc in cursor:
+                f.write(doc.raw)
+                document_count += 1
+            self._release_page_cache(f)
+        
+        # mongodump's companion file, so mongorestore can also recreate options and indexes from this directory
+        collection_metadata = {
+            'options': db[collection_name].options(),
+            'indexes': list(db[collection_name].list_indexes()),
+            'collectionName': collection_name,
+            'type': 'collection'
+        }
+        with open(db_backup_path / f"{collection_name}.metadata.json", 'w') as f:
+            f.write(json_util.dumps(collection_metadata, json_options=json_util.CANONICAL_JSON_OPTIONS))
+        
+        self.logger.info(f"Backed up collection {collection_name} ({document_count} documents)")
+        return collection_file.stat().st_size
+    
+    def _backup_collection_to_ndjson(self, db, collection_name, db_backup_path, compress=False):
+        """Write one collection to <name>.ndjson (or <name>.ndjson.gz), returning the file size in bytes"""
+        collection = db[collection_name]
+        collection_file = db_backup_path / f"{collection_name}.ndjson{'.gz' if compress else ''}"
+        
+        # Stream the cursor to disk so memory stays flat regardless of collection size;
+        # a large write buffer coalesces the per-document writes into few syscalls
+        with self._dump_cursor(collection) as cursor, \
+                open(collection_file, 'wb', buffering=FILE_BUFFER_SIZE) as f:
+            if compress:
+                # Buffer ahead of the compressor too, so it sees large chunks rather than one line at a time
+                with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=self.ndjson_gzip_level) as compressed, \
+                        io.BufferedWriter(compressed, buffer_size=FILE_BUFFER_SIZE) as out:
+                    document_count = self._write_ndjson(cursor, out)
+            else:
+                document_count = self._write_ndjson(cursor, f)
+            self._release_page_cache(f)
+        
+        self.logger.info(f"Backed up collection {collection.name} ({document_count} documents)")
+        return collection_file.stat().st_size
+    
+    def _collection_worker_count(self, task_count):
+        """Threads for a per-collection pool: one per collection up to BACKUP_MAX_WORKERS and the client's pool size"""
+        # Each worker holds a pooled connection while it streams, so more workers than connections would only queue
+        return max(1, min(self.max_workers, task_count, mongo_service.max_pool_size))
+    
+    def _nested_worker_counts(self, task_count):
+        """Per-collection threads and writer threads per collection whose combined connections fit the client's pool"""
+        # Each collection can hold one connection for its source cursor plus one per writer thread, so the
+        # product of the two levels, not either level alone, has to stay within maxPoolSize
+        pool_size = mongo_service.max_pool_size
+        collection_workers = max(1, min(self.max_workers, task_count, pool_size // 2))
+        writer_workers = max(1, min(self.insert_workers, pool_size // collection_workers - 1))
+        return collection_workers, writer_workers
+    
+    def _dump_cursor(self, collection):
+        """Open a cursor over a whole collection for dumping to disk"""
+        # An exhaust cursor has the server stream every batch back to back instead of waiting for a getMore
+        # each time. Only a direct connection (unless it is to a mongos) or a replica set supports it: mongos and
+        # load-balanced (serverless) deployments reject exhaust, so every other topology keeps the regular cursor
+        client = collection.database.client
+        exhaust = (client.topology_description.topology_type in (TOPOLOGY_TYPE.Single, TOPOLOGY_TYPE.ReplicaSetWithPrimary)
+                   and not client.is_mongos)
+        cursor_type = CursorType.EXHAUST if exhaust else CursorType.NON_TAILABLE
+        return collection.find(batch_size=self.batch_size, cursor_type=cursor_type)
+    
+    def _write_ndjson(self, documents, f):
+        """Write documents to a binary file as newline-delimited JSON, returning how many were written"""
+        dumps = orjson.dumps
+        # pymongo hands back naive UTC datetimes; mark them as UTC so the text is unambiguous
+        options = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NAIVE_UTC
+        document_count = 0
+        for doc in documents:
+            # orjson hands types it can't encode to default=str, which writes ObjectIds (the _id included) as plain strings
+            f.write(dumps(doc, default=str, option=options))
+            document_count += 1
+        return document_count
+    
     def restore_backup(self, connection_string, backup_name, target_database=None, selected_collections=None, target_collections_filter=None, options=None, restore_source='file_system'):
         """Restore a backup to MongoDB using mongorestore with optional collection selection and target filtering"""
         
-        if restore_source == 'database':
-            return self._restore_database_backup(connection_string, backup_name, target_database, selected_collections, target_collections_filter, options)
-        else:
-            return self._restore_file_system_backup(connection_string, backup_name, target_database, selected_collections, target_collections_filter, options)
+        try:
+            if restore_source == 'database':
+                return self._restore_database_backup(connection_string, backup_name, target_database, selected_collections, target_collections_filter, options)
+            else:
+                return self._restore_file_system_backup(connection_string, backup_name, target_database, selected_collections, target_collections_filter, options)
+        finally:
+            # Even a failed restore may have written some collections
+            database_service.invalidate_metadata(connection_string)
 
     def _restore_file_system_backup(self, connection_string, backup_name, target_database=None, selected_collections=None, target_collections_filter=None, options=None):
         """Restore a backup from file system (existing logic)"""
@@ -413,8 +838,7 @@ class BackupService:
         metadata_file = backup_path / 'metadata.json'
         metadata = {}
         if metadata_file.exists():
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
+            metadata = load_json_file(metadata_file)
         
         original_database = metadata.get('database', 'unknown')
         target_db = target_database or original_database
@@ -428,7 +852,7 @@ class BackupService:
             backup_method = metadata.get('method', 'mongodump')
             
             if backup_method == 'python':
-                return self._restore_python_backup(connection_string, backup_path, target_db, metadata, selected_collections, target_collections_filter)
+                return self._restore_python_backup(connection_string, backup_path, target_db, metadata, selected_collections, target_collections_filter, options)
             else:
                 return self._restore_mongodump_backup(connection_string, backup_path, target_db, metadata, selected_collections, target_collections_filter, options)
                 
@@ -438,131 +862,118 @@ class BackupService:
     def _restore_database_backup(self, connection_string, backup_name, target_database=None, selected_collections=None, target_collections_filter=None, options=None):
         """Restore a backup from database storage"""
         try:
-            with mongo_service.get_client(self.backup_db_connection) as backup_client:
-                backup_db = backup_client['backup_db']
-                
-                # Find the backup collection
-                backup_collection = None
-                backup_collection_name = None
-                
-                # First, try to find by exact collection name
-                collection_names = backup_db.list_collection_names()
-                if backup_name in collection_names:
-                    backup_collection_name = backup_name
-                    backup_collection = backup_db[backup_name]
-                else:
-                    # Search for backup by backup_identifier in metadata
-                    for collection_name in collection_names:
-                        if collection_name.startswith('system.'):
-                            continue
-                        
-                        collection = backup_db[collection_name]
-                        metadata_doc = collection.find_one({'_id': 'BACKUP_METADATA'})
-                        
-                        if metadata_doc is not None and 'metadata' in metadata_doc:
-                            metadata = metadata_doc['metadata']
-                            if metadata.get('backup_identifier') == backup_name:
-                                backup_collection = collection
-                                backup_collection_name = collection_name
-                                break
-                
-                if backup_collection is None:
-                    raise FileNotFoundError(f"Database backup '{backup_name}' not found")
-                
-                # Get metadata
-                metadata_doc = backup_collection.find_one({'_id': 'BACKUP_METADATA'})
-                if metadata_doc is None or 'metadata' not in metadata_doc:
-                    raise Exception("Backup metadata not found")
-                
-                metadata = metadata_doc['metadata']
-                original_database = metadata.get('source_database', 'unknown')
-                target_db = target_database or original_database
-                
-                # Validate target database name
-                is_valid, message = validate_database_name(target_db)
-                if not is_valid:
-                    raise ValueError(message)
+            backup_client = mongo_service.get_bulk_client(self.backup_db_connection)
+            backup_db = backup_client['backup_db']
+            
+            # Find the backup collection
+            backup_collection, backup_collection_name = self._find_backup_collection(backup_db, backup_name)
+            
+            if backup_collection is None:
+                raise FileNotFoundError(f"Database backup '{backup_name}' not found")
+            
+            # Get metadata
+            metadata_doc = backup_collection.find_one({'_id': 'BACKUP_METADATA'})
+            if metadata_doc is None or 'metadata' not in metadata_doc:
+                raise Exception("Backup metadata not found")
+            
+            metadata = metadata_doc['metadata']
+            original_database = metadata.get('source_database', 'unknown')
+            target_db = target_database or original_database
+            
+            # Validate target database name
+            is_valid, message = validate_database_name(target_db)
+            if not is_valid:
+                raise ValueError(message)
+            
+            # Connect to target database
+            target_client = mongo_service.get_bulk_client(connection_string)
+            target_db_obj = target_client.get_database(target_db, write_concern=self.restore_write_concern)
+            
+            # Collections to restore come from the metadata, so no document has to be read to find them
+            backed_up = [col['name'] for col in metadata.get('collections_backed_up', [])]
+            if not backed_up:
+                backed_up = backup_collection.distinct('original_collection')
+            
+            # Filter collections if specified
+            collections_to_restore = backed_up
+            if selected_collections is not None:
+                collections_to_restore = [col for col in collections_to_restore if col in selected_collections]
+            
+            if target_collections_filter is not None:
+                collections_to_restore = [col for col in collections_to_restore if col in target_collections_filter]
+            
+            collections_to_restore = self._without_system_collections(collections_to_restore)
+            restored_collections = []
+            
+            if collections_to_restore:
+                # Each collection streams from its own index range scan in bounded batches instead of
+                # grouping the whole backup in memory; older backups get the index on first restore,
+                # which on a large legacy collection is a build well past the client's socket timeout
+                # (and a no-op once the index exists)
+                with mongo_service.long_operation():
+                    backup_collection.create_index('original_collection')
+                preserve_existing = self._is_upsert_restore(options)
                 
-                # Connect to target database
-                with mongo_service.get_client(connection_string) as target_client:
-                    target_db_obj = target_client[target_db]
-                    
-                    # Get all backup documents (excluding metadata)
-                    backup_documents = list(backup_collection.find({'_id': {'$ne': 'BACKUP_METADATA'}}))
-                    
-                    # Group documents by original collection
-                    collections_data = {}
-                    for doc in backup_documents:
-                        original_collection = doc.get('original_collection')
-                        if original_collection is None:
-                            continue
-                        
-                        if original_collection not in collections_data:
-                            collections_data[original_collection] = []
-                        
-                        # Extract original document data
-                        original_doc = doc.get('data', {})
-                        # Restore original _id
-                        if 'original_id' in doc:
-                            try:
-                                from bson import ObjectId
-                                original_doc['_id'] = ObjectId(doc['original_id'])
-                            except:
-                                original_doc['_id'] = doc['original_id']
-                        
-                        collections_data[original_collection].append(original_doc)
-                    
-                    # Filter collections if specified
-                    collections_to_restore = list(collections_data.keys())
-                    if selected_collections is not None:
-                        collections_to_restore = [col for col in collections_data.keys() if col in selected_collections]
-                    
-                    if target_collections_filter is not None:
-                        collections_to_restore = [col for col in collections_to_restore if col in target_collections_filter]
-                    
-                    restored_collections = []
+                with ThreadPoolExecutor(max_workers=self._collection_worker_count(len(collections_to_restore))) as executor:
+                    futures = {
+                        executor.submit(
+                            self._restore_stored_collection, backup_collection, collection_name,
+                            target_db_obj[collection_name], preserve_existing
+                        ): collection_name
+                        for collection_name in collections_to_restore
+                    }
                     
-                    # Restore each collection
-                    for collection_name in collections_to_restore:
-                        # Skip system collections for restore
-                        if collection_name.startswith('system.'):
-                            self.logger.info(f"Skipping system collection: {collection_name}")
+                    for future in as_completed(futures):
+                        collection_name = futures[future]
+                        try:
+                            document_count = future.result()
+                        except Exception as e:
+                            self.logger.warning(f"Failed to restore collection {collection_name}: {e}")
                             continue
                         
-                        if collection_name in collections_data:
-                            documents = collections_data[collection_name]
-                            
-                            if len(documents) > 0:  # Use len() instead of just checking documents
-                                try:
-                                    target_collection = target_db_obj[collection_name]
-                                    # Use delete_many instead of drop to safely clear existing data
-                                    target_collection.delete_many({})
-                                    target_collection.insert_many(documents)
-                                    restored_collections.append(collection_name)
-                                    self.logger.info(f"Restored collection {collection_name} ({len(documents)} documents)")
-                                except Exception as e:
-                                    self.logger.warning(f"Failed to restore collection {collection_name}: {e}")
-                                    continue
-                    
-                    if len(restored_collections) == 0:
-                        raise Exception("No collections were successfully restored")
-                    
-                    return {
-                        'success': True,
-                        'message': 'Database backup restored successfully',
-                        'restore': {
-                            'source_backup': backup_name,
-                            'source_collection': backup_collection_name,
-                            'target_database': target_db,
-                            'original_database': original_database,
-                            'collections_restored': restored_collections,
-                            'method': 'database_restore'
-                        }
-                    }
-                    
+                        if document_count:
+                            restored_collections.append(collection_name)
+                            self.logger.info(f"Restored collection {collection_name} ({document_count} documents)")
+            
+            if len(restored_collections) == 0:
+                raise Exception("No collections were successfully restored")
+            
+            return {
+                'success': True,
+                'message': 'Database backup restored successfully',
+                'restore': {
+                    'source_backup': backup_name,
+                    'source_collection': backup_collection_name,
+                    'target_database': target_db,
+                    'original_database': original_database,
+                    'collections_restored': restored_collections,
+                    'method': 'database_restore'
+                }
+            }
+            
         except Exception as e:
             self.logger.error(f"Failed to restore database backup {backup_name}: {e}")
             raise
+    def _restore_stored_collection(self, backup_collection, collection_name, target_collection, preserve_existing=False):
+        """Stream one collection's documents out of a database-storage backup into the target collection"""
+        def stored_documents():
+            query = {'original_collection': collection_name}
+            with backup_collection.find(query, batch_size=self.batch_size) as cursor:
+                for doc in cursor:
+                    # Extract original document data
+                    original_doc = doc.get('data') or {}
+                    # Restore original _id
+                    original_id = doc.get('original_id')
+                    if original_id:
+                        try:
+                            original_doc['_id'] = ObjectId(original_id)
+                        except Exception:
+                            original_doc['_id'] = original_id
+                    yield original_doc
+        
+        batches = self._restore_batches(stored_documents(), collection_name)
+        return self._restore_document_batches(target_collection, batches, preserve_existing)
+    
     def _restore_mongodump_backup(self, connection_string, backup_path, target_db, metadata, selected_collections=None, target_collections_filter=None, options=None):
         """Restore backup created with mongodump with optional collection selection and target filtering"""
         try:
@@ -571,6 +982,9 @@ class BackupService:
         except (subprocess.CalledProcessError, FileNotFoundError):
             raise Exception("mongorestore is not available. Cannot restore mongodump backup.")
         
+        if metadata.get('archive_file'):
+            return self._restore_mongodump_archive(connection_string, backup_path, target_db, metadata, selected_collections, target_collections_filter, options)
+        
         # Find the database directory within the backup
         db_path = backup_path / metadata.get('database', target_db)
         if not db_path.exists():
@@ -581,8 +995,10 @@ class BackupService:
             else:
                 raise Exception("No database directory found in backup")
         
-        # Check if backup contains gzipped files
-        has_gzipped_files = any(f.name.endswith('.gz') for f in db_path.rglob('*') if f.is_file())
+        # One directory listing answers the gzip check and every per-collection existence check below
+        with os.scandir(db_path) as entries:
+            dump_files = {entry.name for entry in entries if entry.is_file()}
+        has_gzipped_files = any(name.endswith('.gz') for name in dump_files)
         
         restored_collections = []
         
@@ -592,48 +1008,23 @@ class BackupService:
             if target_collections_filter:
                 collections_to_restore = [col for col in selected_collections if col in target_collections_filter]
             
-            # Restore only selected collections
-            for collection_name in collections_to_restore:
-                # Skip system collections for restore
-                if collection_name.startswith('system.'):
-                    self.logger.info(f"Skipping system collection: {collection_name}")
-                    continue
-                
-                # Check for both .bson and .bson.gz files for robustness
-                collection_file_path = None
-                is_gzipped_file = False
-                if (db_path / f"{collection_name}.bson.gz").exists():
-                    collection_file_path = db_path / f"{collection_name}.bson.gz"
-                    is_gzipped_file = True
-                elif (db_path / f"{collection_name}.bson").exists():
-                    collection_file_path = db_path / f"{collection_name}.bson"
-
-                if collection_file_path:
-                    cmd = [
-                        'mongorestore',
-                        '--uri', connection_string,
-                        '--db', target_db,
-                        '--collection', collection_name,
+            # Restore only selected collections, one mongorestore process per collection running concurrently
+            collections_to_restore = self._without_system_collections(collections_to_restore)
+            if collections_to_restore:
+                with ThreadPoolExecutor(max_workers=min(self.restore_concurrency, len(collections_to_restore))) as executor:
+                    futures = [
+                        executor.submit(self._restore_one_collection, connection_string, db_path, dump_files, target_db, collection_name, options)
+                        for collection_name in collections_to_restore
                     ]
-                    
-                    if is_gzipped_file:
-                        cmd.append('--gzip')
-                    
-                    if options and options.get('drop'):
-                        cmd.append('--drop')
-                    
-                    # Add file path as the last argument
-                    cmd.append(str(collection_file_path))
-
-                    result = subprocess.run(cmd, capture_output=True, text=True)
-                    
-                    if result.returncode == 0:
-                        restored_collections.append(collection_name)
-                        self.logger.info(f"Restored collection: {collection_name}")
-                    else:
-                        self.logger.warning(f"Failed to restore collection {collection_name}: {result.stderr}")
-                else:
-                    self.logger.warning(f"Collection file not found for: {collection_name}")
+                    for future in as_completed(futures):
+                        collection_name, ok, stderr = future.result()
+                        if ok:
+                            restored_collections.append(collection_name)
+                            self.logger.info(f"Restored collection: {collection_name}")
+                        elif stderr is None:
+                            self.logger.warning(f"Collection file not found for: {collection_name}")
+                        else:
+                            self.logger.warning(f"Failed to restore collection {collection_name}: {stderr}")
             
             if not restored_collections:
                 raise Exception("No collections were successfully restored")
@@ -646,6 +1037,7 @@ class BackupService:
                 # FIX: Exclude system collections to prevent "InvalidNamespace" errors
                 '--excludeCollection=system.version'
             ]
+            cmd.extend(self._mongorestore_parallel_args(options))
             
             # Add gzip flag if backup contains compressed files
             if has_gzipped_files:
@@ -659,15 +1051,11 @@ class BackupService:
             cmd.append(str(db_path))
             
             self.logger.info(f"Starting restore of backup to database {target_db}")
-            self.logger.info(f"Restore command: {' '.join(cmd)}")
+            self.logger.info(f"Restore command: {' '.join(cmd[:1] + cmd[3:])}")  # Without the --uri pair and its credentials
             
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = self._run_streaming(cmd)
             
             self.logger.info(f"Mongorestore return code: {result.returncode}")
-            if result.stdout:
-                self.logger.info(f"Stdout: {result.stdout}")
-            if result.stderr:
-                self.logger.info(f"Stderr: {result.stderr}")
             
             if result.returncode != 0:
                 # Allow exit code 0 (success) and check for specific warnings that are not fatal
@@ -695,130 +1083,532 @@ class BackupService:
             }
         }
 
-    def _restore_python_backup(self, connection_string, backup_path, target_db, metadata, selected_collections=None, target_collections_filter=None):
+    def _list_user_collection_names(self, db):
+        """List a database's collections with system.* filtered out by the server"""
+        # A name-only filter lets the driver send nameOnly=True, so no options or index info comes back
+        return db.list_collection_names(filter={'name': {'$not': {'$regex': SYSTEM_COLLECTION_REGEX}}})
+
+    def _without_system_collections(self, collection_names):
+        """Drop system.* namespaces up front so loops only see user collections"""
+        user_collections = [name for name in collection_names if not name.startswith(SYSTEM_COLLECTION_PREFIX)]
+        if len(user_collections) != len(collection_names):
+            skipped = [name for name in collection_names if name.startswith(SYSTEM_COLLECTION_PREFIX)]
+            self.logger.info(f"Skipping system collections: {', '.join(skipped)}")
+        return user_collections
+
+    @contextmanager
+    def _uri_config(self, cmd):
+        """Move a tool's --uri argument into a private --config file so credentials stay out of the process list"""
+        tool = next((arg for arg in cmd if arg in ('mongodump', 'mongorestore')), None)
+        if '--uri' not in cmd or tool is None or not self._supports_config_file(tool):
+            yield cmd
+            return
+        
+        position = cmd.index('--uri')
+        # mkstemp creates the file readable by this user only; the tools read it once at startup
+        fd, config_path = tempfile.mkstemp(dir=self.temp_dir, suffix='.yaml')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                # A JSON string is a valid YAML double-quoted scalar
+                f.write(b'uri: ' + orjson.dumps(cmd[position + 1]) + b'\n')
+            yield cmd[:position] + [f'--config={config_path}'] + cmd[position + 2:]
+        finally:
+            os.unlink(config_path)
+    
+    def _supports_config_file(self, tool):
+        """Whether a Database Tools binary accepts --config (added in 100.3.0), checked once per tool"""
+        supported = self._config_file_support.get(tool)
+        if supported is None:
+            try:
+                output = subprocess.run([tool, '--version'], capture_output=True, text=True).stdout
+            except OSError:
+                output = ''
+            match = re.search(r'version:\s*r?(\d+)\.(\d+)', output)
+            supported = bool(match) and (int(match.group(1)), int(match.group(2))) >= (100, 3)
+            if not supported:
+                self.logger.warning(f"{tool} is older than Database Tools 100.3.0 or its version is unknown; passing the connection string with --uri")
+            self._config_file_support[tool] = supported
+        return supported
+    
+    def _run_streaming(self, cmd, stdin=None, tail_lines=200):
+        """Run a tool, logging its output as it arrives and keeping only the tail for error reports"""
+        tail = deque(maxlen=tail_lines)
+        # Read raw bytes and only decode what is actually logged or kept, not every progress line
+        log_lines = self.logger.isEnabledFor(logging.INFO)
+        tool_name = self._tool_name(cmd)
+        # The config file has to outlive the process, which may read it at any point after starting
+        with self._uri_config(cmd) as tool_cmd:
+            process = subprocess.Popen(tool_cmd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            with process.stdout:
+                for line in process.stdout:
+                    line = line.rstrip()
+                    if line:
+                        tail.append(line)
+                        if log_lines:
+                            self.logger.info(f"{tool_name}: {line.decode(errors='replace')}")
+            process.wait()
+        
+        # mongodump/mongorestore log to stderr, so expose the merged tail through both fields
+        output = b'\n'.join(tail).decode(errors='replace')
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout=output, stderr=output)
+
+    def _restore_one_collection(self, connection_string, db_path, dump_files, target_db, collection_name, options=None):
+        """Run mongorestore for a single collection file, returning (name, ok, stderr); stderr is None if the file is missing"""
+        # Check for both .bson and .bson.gz files for robustness
+        collection_file_path = None
+        is_gzipped_file = False
+        if f"{collection_name}.bson.gz" in dump_files:
+            collection_file_path = db_path / f"{collection_name}.bson.gz"
+            is_gzipped_file = True
+        elif f"{collection_name}.bson" in dump_files:
+            collection_file_path = db_path / f"{collection_name}.bson"
+        
+        if not collection_file_path:
+            return collection_name, False, None
+        
+        cmd = [
+            'mongorestore',
+            '--uri', connection_string,
+            '--db', target_db,
+            '--collection', collection_name,
+            f'--numInsertionWorkersPerCollection={int((options or {}).get("insertion_workers") or self.restore_insertion_workers)}'
+        ]
+        
+        if is_gzipped_file:
+            cmd.append('--gzip')
+        
+        if options and options.get('drop'):
+            cmd.append('--drop')
+        
+        # Add file path as the last argument
+        cmd.append(str(collection_file_path))
+        
+        result = self._run_streaming(cmd)
+        return collection_name, result.returncode == 0, result.stderr
+
+    def _mongorestore_parallel_args(self, options=None):
+        """Concurrency flags so mongorestore restores collections and batches in parallel"""
+        # Per-request overrides mirror mongodump's parallel_collections option; the defaults scale with CPU count
+        parallel_collections = options.get('parallel_collections') if options else None
+        insertion_workers = options.get('insertion_workers') if options else None
+        return [
+            f'--numParallelCollections={int(parallel_collections or self.restore_parallel_collections)}',
+            f'--numInsertionWorkersPerCollection={int(insertion_workers or self.restore_insertion_workers)}'
+        ]
+
+    def _restore_mongodump_archive(self, connection_string, backup_path, target_db, metadata, selected_collections=None, target_collections_filter=None, options=None):
+        """Restore a single-file mongodump archive, decompressing it on the fly if needed"""
+        archive_path = backup_path / metadata['archive_file']
+        if not archive_path.exists():
+            raise FileNotFoundError(f"Backup archive '{metadata['archive_file']}' not found")
+        
+        original_db = metadata.get('database', target_db)
+        cmd = [
+            'mongorestore',
+            '--uri', connection_string,
+            f'--nsFrom={original_db}.*',
+            f'--nsTo={target_db}.*'
+        ]
+        
+        collections_to_restore = None
+        if selected_collections:
+            # Filter collections to restore based on target collections filter
+            collections_to_restore = [
+                col for col in selected_collections
+                if not col.startswith(SYSTEM_COLLECTION_PREFIX) and (not target_collections_filter or col in target_collections_filter)
+            ]
+            if not collections_to_restore:
+                raise Exception("No collections were successfully restored")
+            cmd.extend(f'--nsInclude={original_db}.{col}' for col in collections_to_restore)
+        else:
+            cmd.extend([f'--nsInclude={original_db}.*', f'--nsExclude={original_db}.system.*'])
+        cmd.extend(self._mongorestore_parallel_args(options))
+        
+        if options and options.get('drop'):
+            cmd.append('--drop')
+        
+        self.logger.info(f"Starting archive restore of backup to database {target_db}")
+        
+        compression = metadata.get('archive_compression')
+        if compression == 'zstd':
+            decompressor = ['zstd', '-dc', '-q']
+        elif compression == 'gzip':
+            decompressor = ['pigz', '-dc'] if shutil.which('pigz') else ['gzip', '-dc']
+        else:
+            decompressor = None
+        
+        if decompressor is None:
+            cmd.append(f'--archive={archive_path}')
+            if compression == 'mongodump':
+                cmd.append('--gzip')
+            result = self._run_streaming(cmd)
+        else:
+            # Stream the decompressed archive straight into mongorestore's stdin
+            cmd.append('--archive')
+            decompress = subprocess.Popen(decompressor + [str(archive_path)], stdout=subprocess.PIPE)
+            try:
+                result = self._run_streaming(cmd, stdin=decompress.stdout)
+            finally:
+                decompress.stdout.close()
+                decompress.wait()
+            
+            if result.returncode != 0:
+                # A decompressor killed by SIGPIPE only saw mongorestore stop reading, so mongorestore's error is the cause
+                if decompress.returncode not in (0, -signal.SIGPIPE, 128 + signal.SIGPIPE):
+                    raise Exception(f"mongorestore failed after {decompressor[0]} failed to decompress {archive_path.name} (exit code {decompress.returncode}): {result.stderr}")
+                raise Exception(f"mongorestore failed: {result.stderr}")
+            # A truncated or corrupt archive can end the stream early while mongorestore still exits cleanly
+            if decompress.returncode != 0:
+                raise Exception(f"{decompressor[0]} failed to decompress {archive_path.name} (exit code {decompress.returncode})")
+        
+        if result.returncode != 0:
+            raise Exception(f"mongorestore failed: {result.stderr}")
+        
+        return {
+            'success': True,
+            'message': 'Backup restored successfully',
+            'restore': {
+                'source_backup': backup_path.name,
+                'target_database': target_db,
+                'original_database': metadata.get('database'),
+                'collections_restored': collections_to_restore or 'all',
+                'method': 'mongorestore'
+            }
+        }
+
+    def _restore_python_backup(self, connection_string, backup_path, target_db, metadata, selected_collections=None, target_collections_filter=None, options=None):
         """Restore backup created with Python method with optional collection selection and target filtering"""
         try:
-            with mongo_service.get_client(connection_string) as client:
-                db = client[target_db]
-                
-                # Find database directory
-                original_db = metadata.get('database', target_db)
-                db_backup_path = backup_path / original_db
-                
-                if not db_backup_path.exists():
-                    raise Exception("Database backup directory not found")
-                
-                restored_collections = []
+            # Upsert into existing collections instead of replacing them when asked to keep existing data
+            preserve_existing = self._is_upsert_restore(options)
+            
+            client = mongo_service.get_bulk_client(connection_string)
+            db = client.get_database(target_db, write_concern=self.restore_write_concern)
+            
+            # Find database directory
+            original_db = metadata.get('database', target_db)
+            db_backup_path = backup_path / original_db
+            
+            if not db_backup_path.exists():
+                raise Exception("Database backup directory not found")
+            
+            # Backups store raw BSON or NDJSON (optionally gzip-compressed); older ones a JSON array per collection
+            backup_format = metadata.get('format') or self._detect_python_backup_format(db_backup_path)
+            if backup_format == 'bson':
+                suffix, restore_file = '.bson', self._restore_bson_collection
+            elif backup_format in ('ndjson', 'ndjson.gz'):
+                suffix, restore_file = f'.{backup_format}', self._restore_ndjson_collection
+            elif backup_format == 'json.gz':
+                suffix, restore_file = '.json.gz', self._restore_json_collection
+            else:
+                suffix, restore_file = '.json', self._restore_json_collection
+            
+            collection_files = []
+            
+            if selected_collections:
+                # Filter collections to restore based on target collections filter
+                collections_to_restore = selected_collections
+                if target_collections_filter:
+                    collections_to_restore = [col for col in selected_collections if col in target_collections_filter]
                 
-                if selected_collections:
-                    # Filter collections to restore based on target collections filter
-                    collections_to_restore = selected_collections
-                    if target_collections_filter:
-                        collections_to_restore = [col for col in selected_collections if col in target_collections_filter]
+                # Restore only selected collections
+                for collection_name in self._without_system_collections(collections_to_restore):
+                    json_file = db_backup_path / f"{collection_name}{suffix}"
                     
-                    # Restore only selected collections
-                    for collection_name in collections_to_restore:
-                        # Skip system collections for restore
-                        if collection_name.startswith('system.'):
-                            self.logger.info(f"Skipping system collection: {collection_name}")
-                            continue
-                            
-                        json_file = db_backup_path / f"{collection_name}.json"
-                        
-                        if json_file.exists():
-                            try:
-                                with open(json_file, 'r') as f:
-                                    documents = json.load(f)
-                                
-                                if documents:
-                                    collection = db[collection_name]
-                                    # Use delete_many instead of drop to safely clear existing data
-                                    collection.delete_many({})
-                                    collection.insert_many(documents)
-                                    restored_collections.append(collection_name)
-                                    self.logger.info(f"Restored collection {collection_name} ({len(documents)} documents)")
-                            except Exception as e:
-                                self.logger.warning(f"Failed to restore collection {collection_name}: {e}")
-                                continue
-                        else:
-                            self.logger.warning(f"Collection file not found: {collection_name}.json")
+                    if json_file.exists():
+                        collection_files.append((collection_name, json_file))
+                    else:
+                        self.logger.warning(f"Collection file not found: {collection_name}{suffix}")
+            else:
+                # Restore all collections
+                json_files = {json_file.name[:-len(suffix)]: json_file for json_file in db_backup_path.glob(f'*{suffix}')}
+                collection_files.extend(
+                    (collection_name, json_files[collection_name])
+                    for collection_name in self._without_system_collections(json_files)
+                )
+            
+            # Replace mode already rebuilds indexes after the load; upserts can opt into the same
+            rebuild_indexes = preserve_existing and bool(options and options.get('rebuild_indexes'))
+            
+            def restore_collection(collection, collection_file):
+                if not rebuild_indexes:
+                    return restore_file(collection, collection_file, preserve_existing)
+                # Build secondary indexes once at the end instead of maintaining them on every upsert
+                indexes = [idx for idx in collection.list_indexes() if idx['name'] != '_id_']
+                if indexes:
+                    collection.drop_indexes()
+                try:
+                    return restore_file(collection, collection_file, preserve_existing)
+                finally:
+                    if indexes:
+                        self._recreate_indexes(collection, indexes)
+            
+            # Collections are independent, restore them concurrently on the shared (thread-safe) client;
+            # starting the largest files first keeps one big collection from running alone at the end
+            collection_files.sort(key=lambda item: item[1].stat().st_size, reverse=True)
+            restored_collections = []
+            if collection_files:
+                with ThreadPoolExecutor(max_workers=self._collection_worker_count(len(collection_files))) as executor:
+                    futures = {
+                        executor.submit(restore_collection, db[collection_name], json_file): collection_name
+                        for collection_name, json_file in collection_files
+                    }
                     
-                    if not restored_collections:
-                        raise Exception("No collections were successfully restored")
-                else:
-                    # Restore all collections
-                    for json_file in db_backup_path.glob('*.json'):
-                        collection_name = json_file.stem
-                        
-                        # Skip system collections for restore
-                        if collection_name.startswith('system.'):
-                            self.logger.info(f"Skipping system collection: {collection_name}")
-                            continue
-                        
+                    for future in as_completed(futures):
+                        collection_name = futures[future]
                         try:
-                            with open(json_file, 'r') as f:
-                                documents = json.load(f)
-                            
-                            if documents:
-                                collection = db[collection_name]
-                                # Use delete_many instead of drop to safely clear existing data
-                                collection.delete_many({})
-                                collection.insert_many(documents)
-                                restored_collections.append(collection_name)
-                                self.logger.info(f"Restored collection {collection_name} ({len(documents)} documents)")
+                            document_count = future.result()
                         except Exception as e:
                             self.logger.warning(f"Failed to restore collection {collection_name}: {e}")
                             continue
-                
-                return {
-                    'success': True,
-                    'message': 'Backup restored successfully',
-                    'restore': {
-                        'source_backup': backup_path.name,
-                        'target_database': target_db,
-                        'original_database': original_db,
-                        'collections_restored': restored_collections,
-                        'method': 'python'
-                    }
+                        
+                        if document_count:
+                            restored_collections.append(collection_name)
+                            self.logger.info(f"Restored collection {collection_name} ({document_count} documents)")
+            
+            if selected_collections and not restored_collections:
+                raise Exception("No collections were successfully restored")
+            
+            return {
+                'success': True,
+                'message': 'Backup restored successfully',
+                'restore': {
+                    'source_backup': backup_path.name,
+                    'target_database': target_db,
+                    'original_database': original_db,
+                    'collections_restored': restored_collections,
+                    'method': 'python'
                 }
-                
+            }
+            
         except Exception as e:
             self.logger.error(f"Python restore failed: {e}")
             raise
     
+    def _is_upsert_restore(self, options):
+        """Whether a restore upserts by _id (mode='upsert') rather than dropping and reloading (mode='replace_all')"""
+        if not options:
+            return False
+        # preserve_existing predates the mode option and means the same as upsert
+        return options.get('mode', 'replace_all') == 'upsert' or bool(options.get('preserve_existing'))
+    
+    def _detect_python_backup_format(self, db_backup_path):
+        """Work out a python backup's file format from its files, for metadata that does not record one"""
+        with os.scandir(db_backup_path) as entries:
+            names = [entry.name for entry in entries if entry.is_file()]
+        # Prefer raw BSON when present: it decodes fastest and keeps every BSON type
+        for backup_format in ('bson', 'ndjson', 'ndjson.gz', 'json.gz'):
+            if any(name.endswith(f'.{backup_format}') for name in names):
+                return backup_format
+        return 'json'
+    
+    def _restore_json_collection(self, collection, json_file, preserve_existing=False):
+        """Stream a JSON array backup file into a collection in batches, returning the number of documents inserted"""
+        if json_file.name.endswith('.gz'):
+            # Decompress on the fly; the array is parsed incrementally so the file never sits in memory whole
+            with open(json_file, 'rb', buffering=FILE_BUFFER_SIZE) as compressed, \
+                    io.BufferedReader(gzip.GzipFile(fileobj=compressed, mode='rb'), buffer_size=FILE_BUFFER_SIZE) as f:
+                return self._restore_json_stream(collection, f, preserve_existing)
+        
+        with open(json_file, 'rb', buffering=FILE_BUFFER_SIZE) as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size < FULL_PARSE_THRESHOLD_BYTES:
+                # Small enough to hold twice in memory; orjson parses it far faster than ijson can stream it
+                data = f.read()
+                try:
+                    documents = iter(orjson.loads(data))
+                except orjson.JSONDecodeError:
+                    # Older backups carry bare NaN/Infinity for non-finite doubles, which only the standard parser accepts
+                    documents = iter(json.loads(data))
+                batches = self._restore_batches(documents, collection.name)
+                return self._restore_document_batches(collection, batches, preserve_existing)
+            
+            # Let the page cache back the file so the scan below (and the parser, for large files) reads pages on demand without an extra copy
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                # Check before parsing: ijson would fail partway through, after earlier batches were already written
+                if NON_FINITE_JSON_VALUE.search(mm):
+                    self.logger.info(f"{json_file.name} contains NaN or Infinity values, restoring it with the standard json parser")
+                    documents = iter(json.load(f))
+                    batches = self._restore_batches(documents, collection.name)
+                    return self._restore_document_batches(collection, batches, preserve_existing)
+                
+                if file_size < MMAP_THRESHOLD_BYTES:
+                    return self._restore_json_stream(collection, f, preserve_existing)
+                return self._restore_json_stream(collection, mm, preserve_existing)
+    
+    def _restore_bson_collection(self, collection, bson_file, preserve_existing=False):
+        """Stream a raw BSON backup file into a collection without decoding the documents"""
+        with open(bson_file, 'rb', buffering=FILE_BUFFER_SIZE) as f:
+            def read_documents():
+                while True:
+                    # Every BSON document starts with its own little-endian int32 length
+                    header = f.read(4)
+                    if len(header) < 4:
+                        return
+                    size = int.from_bytes(header, 'little')
+                    yield RawBSONDocument(header + f.read(size - 4))
+            
+            batches = self._restore_batches(read_documents(), collection.name)
+            return self._restore_document_batches(collection, batches, preserve_existing)
+    
+    def _restore_ndjson_collection(self, collection, ndjson_file, preserve_existing=False):
+        """Stream an NDJSON (or gzip-compressed NDJSON) backup file into a collection, one document per line"""
+        if ndjson_file.name.endswith('.gz'):
+            # GzipFile only buffers 8KB on either side of the decompressor, widen both
+            with open(ndjson_file, 'rb', buffering=FILE_BUFFER_SIZE) as compressed, \
+                    io.BufferedReader(gzip.GzipFile(fileobj=compressed, mode='rb'), buffer_size=FILE_BUFFER_SIZE) as f:
+                return self._restore_ndjson_stream(collection, f, preserve_existing)
+        
+        with open(ndjson_file, 'rb', buffering=FILE_BUFFER_SIZE) as f:
+            return self._restore_ndjson_stream(collection, f, preserve_existing)
+    
+    def _restore_ndjson_stream(self, collection, stream, preserve_existing=False):
+        """Parse NDJSON lines from a binary stream and restore them batch by batch"""
+        documents = (orjson.loads(line) for line in stream if line.strip())
+        batches = self._restore_batches(documents, collection.name)
+        return self._restore_document_batches(collection, batches, preserve_existing)
+    
+    def _restore_json_stream(self, collection, stream, preserve_existing=False):
+        """Parse a JSON array from a readable stream and restore it batch by batch"""
+        documents = ijson.items(stream, 'item', use_float=True)
+        batches = self._restore_batches(documents, collection.name)
+        return self._restore_document_batches(collection, batches, preserve_existing)
+    
+    def _restore_batches(self, documents, collection_name):
+        """Group documents into restore batches bounded by count and by an encoded-size memory budget"""
+        batch = []
+        batch_bytes = 0
+        warned = False
+        for doc in documents:
+            doc = self._raw_document(doc)
+            batch.append(doc)
+            batch_bytes += len(doc.raw)
+            if len(batch) >= self.restore_batch_size:
+                yield batch
+                batch = []
+                batch_bytes = 0
+            elif batch_bytes >= self.max_restore_memory:
+                # Large documents hit the memory budget before the count; say so once so RESTORE_BATCH_SIZE can be tuned
+                if not warned:
+                    self.logger.warning(
+                        f"Restore batch for {collection_name} flushed at {len(batch)} documents "
+                        f"({batch_bytes} bytes) by MAX_RESTORE_MEMORY rather than RESTORE_BATCH_SIZE"
+                    )
+                    warned = True
+                yield batch
+                batch = []
+                batch_bytes = 0
+        if batch:
+            yield batch
+    
+    def _raw_document(self, doc, codec_options=DEFAULT_CODEC_OPTIONS):
+        """Encode a document to RawBSONDocument once, so its size is known and insert_many sends the bytes as they are"""
+        # Measuring a dict with bson.encode and then letting insert_many encode it again did the work twice
+        if isinstance(doc, RawBSONDocument):
+            return doc
+        return RawBSONDocument(bson.encode(doc, codec_options=codec_options))
+    
+    def _restore_document_batches(self, collection, batches, preserve_existing=False):
+        """Write batches of documents into a collection, replacing its contents unless preserve_existing"""
+        document_count = 0
+        dropped = False
+        indexes = []
+        for batch in batches:
+            if not batch:
+                continue
+            
+            if not preserve_existing and not dropped:
+                # Drop is O(1) on the server, unlike a DeleteMany that removes documents one by one;
+                # keep the index definitions to rebuild afterwards
+                indexes = [idx for idx in collection.list_indexes() if idx['name'] != '_id_']
+                # Validators, collation and capped settings live on the collection, so carry them across the drop
+                collection_options = collection.options()
+                collection.drop()
+                if collection_options:
+                    collection.database.create_collection(collection.name, **collection_options)
+                dropped = True
+            
+            try:
+                if preserve_existing:
+                    # Replace matching documents in place, reusing existing index maintenance
+                    collection.bulk_write([
+                        ReplaceOne({'_id': doc['_id']}, doc, upsert=True) if '_id' in doc else InsertOne(doc)
+                        for doc in batch
+                    ], ordered=False, bypass_document_validation=True)
+                else:
+                    # Documents were validated when they were backed up
+                    collection.insert_many(batch, ordered=False, bypass_document_validation=True)
+                document_count += len(batch)
+            except BulkWriteError as e:
+                # Unordered writes keep going past bad documents, log them and carry on with the next batch
+                write_errors = e.details.get('writeErrors', [])
+                written = e.details.get('nInserted', 0) + e.details.get('nUpserted', 0) + e.details.get('nMatched', 0)
+                document_count += written
+                self.logger.warning(f"{len(write_errors)} of {len(batch)} documents failed to restore into {collection.name} "
+                                    f"({written} written): {write_errors[:1]}")
+        
+        if indexes:
+            self._recreate_indexes(collection, indexes)
+        
+        return document_count
+    
+    def _recreate_indexes(self, collection, indexes):
+        """Recreate indexes captured from list_indexes() on a collection"""
+        # Building over a freshly reloaded collection can take far longer than the client's socket timeout
+        with mongo_service.long_operation():
+            collection.create_indexes([
+                IndexModel(list(idx['key'].items()), **{k: v for k, v in idx.items() if k not in ('key', 'v', 'ns')})
+                for idx in indexes
+            ])
+    
     def list_backups(self):
         """List all available backups"""
         try:
             backups = []
             
-            for backup_dir in self.backup_dir.iterdir():
-                if backup_dir.is_dir():
-                    metadata_file = backup_dir / 'metadata.json'
-                    
-                    if metadata_file.exists():
-                        with open(metadata_file, 'r') as f:
-                            metadata = json.load(f)
-                    else:
-                        # Create basic metadata for backups without metadata file
-                        metadata = {
-                            'database': 'unknown',
-                            'created_at': datetime.fromtimestamp(backup_dir.stat().st_ctime).isoformat(),
-                            'method': 'unknown'
-                        }
+            catalog = self._catalog_entries()
+            backup_entries = []
+            uncatalogued = []
+            
+            with os.scandir(self.backup_dir) as entries:
+                for entry in entries:
+                    # Hidden directories are backups still being removed in the background
+                    if entry.name.startswith('.') or not entry.is_dir():
+                        continue
                     
-                    size = self._get_directory_size(backup_dir)
+                    mtime = entry.stat().st_mtime
+                    cached = catalog.get(entry.name)
                     
-                    backups.append({
-                        'name': backup_dir.name,
-                        'database': metadata.get('database'),
-                        'size': size,
-                        'size_formatted': format_bytes(size),
-                        'created_at': metadata.get('created_at'),
-                        'method': metadata.get('method', 'unknown')
-                    })
+                    if cached is not None and cached['mtime'] == mtime:
+                        backup_entries.append(cached)
+                    else:
+                        uncatalogued.append((entry.path, mtime))
+            
+            # New or changed backups need their metadata read and files sized; that is disk-latency
+            # bound and independent per backup, so overlap it on a thread pool
+            stale_entries = []
+            if uncatalogued:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(uncatalogued))) as executor:
+                    stale_entries = list(executor.map(lambda args: self._read_backup_entry(*args), uncatalogued))
+                backup_entries.extend(stale_entries)
             
-            # Sort by creation date (newest first)
-            backups.sort(key=lambda x: x['created_at'], reverse=True)
+            for backup_entry in backup_entries:
+                backups.append({
+                    'name': backup_entry['name'],
+                    'database': backup_entry['database'],
+                    'size': backup_entry['size'],
+                    'size_formatted': format_bytes(backup_entry['size']),
+                    'created_at': backup_entry['created_at'],
+                    'method': backup_entry['method']
+                })
+            
+            present = {backup_entry['name'] for backup_entry in backup_entries}
+            self._catalog_sync(stale_entries, [name for name in catalog if name not in present])
+            
+            # Sort by creation date (newest first); backups without one sort last
+            backups.sort(key=lambda x: x['created_at'] or '', reverse=True)
             
             return {
                 'success': True,
@@ -830,6 +1620,45 @@ class BackupService:
             self.logger.error(f"Failed to list backups: {e}")
             raise
     
+    def _read_backup_entry(self, path, mtime):
+        """Build a catalog entry for a backup directory from its metadata.json, the source of truth"""
+        backup_dir = Path(path)
+        metadata_file = backup_dir / 'metadata.json'
+        
+        size = None
+        if metadata_file.exists():
+            with open(metadata_file, 'rb') as f:
+                metadata_bytes = f.read()
+            metadata = orjson.loads(metadata_bytes)
+            # Backups record their data size when written; trust it so listing does not walk every file
+            recorded_size = metadata.get('size')
+            if isinstance(recorded_size, int) and recorded_size > 0:
+                size = recorded_size + len(metadata_bytes)
+            else:
+                # Older and uploaded backups never recorded one; measure once and write it back for next time
+                size = self._get_directory_size(backup_dir)
+                metadata['size'] = size - len(metadata_bytes)
+                try:
+                    dump_json_file(metadata_file, metadata)
+                except OSError as e:
+                    self.logger.warning(f"Could not record size in {metadata_file}: {e}")
+        else:
+            # Create basic metadata for backups without metadata file
+            metadata = {
+                'database': 'unknown',
+                'created_at': datetime.fromtimestamp(backup_dir.stat().st_ctime).isoformat(),
+                'method': 'unknown'
+            }
+        
+        return {
+            'name': backup_dir.name,
+            'database': metadata.get('database'),
+            'size': size if size is not None else self._get_directory_size(backup_dir),
+            'created_at': metadata.get('created_at'),
+            'method': metadata.get('method', 'unknown'),
+            'mtime': mtime
+        }
+    
     def delete_backup(self, backup_name):
         """Delete a backup"""
         backup_path = self.backup_dir / backup_name
@@ -838,84 +1667,341 @@ class BackupService:
             raise FileNotFoundError(f"Backup '{backup_name}' not found")
         
         try:
-            shutil.rmtree(backup_path)
+            self.discard_tree(backup_path)
+            self._size_cache.pop(str(backup_path), None)
+            self._catalog_sync([], [backup_name])
+            
             self.logger.info(f"Successfully deleted backup {backup_name}")
             
             return {
                 'success': True,
                 'message': f'Backup "{backup_name}" deleted successfully',
-                'backup_name': backup_name
+                'backup_name': backup_name,
+                'status': 'deleting'
             }
             
         except Exception as e:
             self.logger.error(f"Failed to delete backup {backup_name}: {e}")
             raise
     
+    def _init_catalog(self):
+        """Create the backup catalog table if it does not exist yet"""
+        try:
+            with closing(sqlite3.connect(self.catalog_path)) as conn, conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS backups ('
+                    'name TEXT PRIMARY KEY, database_name TEXT, created_at TEXT, method TEXT, size INTEGER, mtime REAL)'
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Backup catalog unavailable, listing will read metadata files: {e}")
+    
+    def _catalog_entries(self):
+        """Load every catalogued file system backup, keyed by directory name"""
+        # Repeated listings are served from memory; entries are still checked against each directory's mtime
+        with self._listing_cache_lock:
+            if self._listing_cache is not None:
+                return dict(self._listing_cache)
+        
+        try:
+            with closing(sqlite3.connect(self.catalog_path)) as conn:
+                rows = conn.execute('SELECT name, database_name, created_at, method, size, mtime FROM backups').fetchall()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to read backup catalog: {e}")
+            return {}
+        
+        catalog = {
+            name: {'name': name, 'database': database, 'created_at': created_at, 'method': method, 'size': size, 'mtime': mtime}
+            for name, database, created_at, method, size, mtime in rows
+        }
+        with self._listing_cache_lock:
+            if self._listing_cache is None:
+                self._listing_cache = catalog
+        return dict(catalog)
+    
+    def _catalog_sync(self, entries, removed_names):
+        """Upsert refreshed catalog entries and forget backups that no longer exist"""
+        if not entries and not removed_names:
+            return
+        with self._listing_cache_lock:
+            if self._listing_cache is not None:
+                self._listing_cache.update((e['name'], e) for e in entries)
+                for name in removed_names:
+                    self._listing_cache.pop(name, None)
+        try:
+            with closing(sqlite3.connect(self.catalog_path)) as conn, conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO backups (name, database_name, created_at, method, size, mtime) VALUES (?, ?, ?, ?, ?, ?)',
+                    [(e['name'], e['database'], e['created_at'], e['method'], e['size'], e['mtime']) for e in entries]
+                )
+                conn.executemany('DELETE FROM backups WHERE name = ?', [(name,) for name in removed_names])
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to update backup catalog: {e}")
+    
+    def _catalog_record(self, backup_path, metadata, size):
+        """Catalog a freshly written backup so the next listing needn't open its metadata.json"""
+        self._catalog_sync([{
+            'name': backup_path.name,
+            'database': metadata.get('database'),
+            'created_at': metadata.get('created_at'),
+            'method': metadata.get('method', 'unknown'),
+            'size': size,
+            'mtime': backup_path.stat().st_mtime
+        }], [])
+    
+    def discard_tree(self, path):
+        """Move a directory tree out of the way and delete it on a background thread"""
+        # The rename is a single metadata operation, so the path is gone (and out of the listing) at once;
+        # the per-file unlinks of a large dump then happen without blocking the caller
+        path = Path(path)
+        trash_path = path.with_name(f".{path.name}{TRASH_MARKER}{datetime.now().strftime('%Y%m%d%H%M%S%f')}")
+        try:
+            path.rename(trash_path)
+        except OSError as e:
+            self.logger.warning(f"Could not rename {path} before deleting it: {e}")
+            trash_path = path
+        threading.Thread(target=self._remove_tree, args=(str(trash_path),), daemon=True).start()
+    
+    def is_trash(self, path):
+        """Whether a path is a tree discard_tree renamed for deletion rather than a live backup or directory"""
+        name = Path(path).name
+        return name.startswith('.') and TRASH_MARKER in name
+    
+    def _sweep_trash(self):
+        """Delete, in the background, trash trees left behind when the process exited before discard_tree finished"""
+        # The removal threads are daemons, so a restart mid-delete leaves the renamed tree on disk for good otherwise
+        trash_paths = [
+            str(path)
+            for directory in (self.backup_dir, self.temp_dir)
+            for path in directory.glob(f'.*{TRASH_MARKER}*')
+        ]
+        if not trash_paths:
+            return
+        self.logger.info(f"Removing {len(trash_paths)} leftover trash tree(s) from an earlier run")
+        
+        def remove_all():
+            for path in trash_paths:
+                self._remove_tree(path)
+        threading.Thread(target=remove_all, daemon=True).start()
+    
+    def _remove_tree(self, path):
+        """Delete a directory tree, preferring rm -rf where available and falling back to the scandir walk"""
+        # rm's readdir/unlinkat loop in C outpaces a Python-level unlink per file on large dump trees
+        if os.name == 'posix' and shutil.which('rm'):
+            result = subprocess.run(['rm', '-rf', '--', path], capture_output=True)
+            if result.returncode == 0:
+                return
+            self.logger.warning(f"rm -rf failed for {path}, falling back to Python removal: {result.stderr.decode(errors='replace').strip()}")
+        self._fast_rmtree(path)
+    
+    def _fast_rmtree(self, path, parallel=True):
+        """Best-effort recursive delete using os.scandir (DirEntry already knows the file type)"""
+        subdirectories = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                else:
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+        # Subtrees found by the top-level scan are removed on separate threads so their unlinks overlap
+        if parallel and len(subdirectories) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(subdirectories), self.max_workers)) as executor:
+                list(executor.map(lambda subdirectory: self._fast_rmtree(subdirectory, parallel=False), subdirectories))
+        else:
+            for subdirectory in subdirectories:
+                self._fast_rmtree(subdirectory, parallel=False)
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+    
     def _get_directory_size(self, directory):
-        """Get total size of directory in bytes"""
-        total_size = 0
-        for file_path in directory.rglob('*'):
-            if file_path.is_file():
-                total_size += file_path.stat().st_size
+        """Get total size of directory in bytes, cached against the directory's mtime"""
+        key = str(directory)
+        mtime = os.stat(key).st_mtime
+        cached = self._size_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        total_size = self._scan_directory_size(key)
+        self._size_cache[key] = (mtime, total_size)
         return total_size
+    
+    def _scan_directory_size(self, path):
+        """Sum file sizes below path using os.scandir, which reuses the stat info from the directory listing"""
+        return self.directory_stats(path)[0]
+    
+    def directory_stats(self, path):
+        """Return (total size in bytes, file count) for everything below path in a single os.scandir walk"""
+        total_size = 0
+        file_count = 0
+        # Explicit stack instead of recursion keeps deep dump trees off the Python call stack
+        stack = [str(path)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                        file_count += 1
+                    elif entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+        return total_size, file_count
+
+    def _find_backup_collection(self, backup_db, backup_name):
+        """Resolve a database backup by collection name or backup identifier"""
+        # Single keyed lookup against the backup index
+        # A backup name can be reused, so the newest backup with that identifier wins
+        index_doc = backup_db[BACKUP_INDEX_COLLECTION].find_one(
+            {'$or': [{'_id': backup_name}, {'backup_identifier': backup_name}]},
+            sort=[('created_at', -1)]
+        )
+        if index_doc is not None:
+            return backup_db[index_doc['_id']], index_doc['_id']
+        
+        # Fall back to scanning collections for backups created before the index existed
+        collection_names = self._list_backup_collections(backup_db)
+        if backup_name in collection_names:
+            collection = backup_db[backup_name]
+            metadata_doc = collection.find_one({'_id': 'BACKUP_METADATA'})
+            if metadata_doc is not None and 'metadata' in metadata_doc:
+                self._index_backup_collection(backup_db, backup_name, metadata_doc['metadata'])
+            return collection, backup_name
+        
+        for collection_name in collection_names:
+            if collection_name.startswith(SYSTEM_COLLECTION_PREFIX) or collection_name == BACKUP_INDEX_COLLECTION:
+                continue
+            
+            collection = backup_db[collection_name]
+            metadata_doc = collection.find_one({'_id': 'BACKUP_METADATA'})
+            
+            if metadata_doc is not None and 'metadata' in metadata_doc:
+                if metadata_doc['metadata'].get('backup_identifier') == backup_name:
+                    self._index_backup_collection(backup_db, collection_name, metadata_doc['metadata'])
+                    return collection, collection_name
+        
+        return None, None
+    
+    def _index_backup_collection(self, backup_db, collection_name, metadata):
+        """Back-fill the backup index for a collection found by scanning"""
+        try:
+            backup_db[BACKUP_INDEX_COLLECTION].replace_one(
+                {'_id': collection_name},
+                {
+                    '_id': collection_name,
+                    'backup_identifier': metadata.get('backup_identifier', collection_name),
+                    'source_database': metadata.get('source_database', 'unknown'),
+                    'created_at': metadata.get('backup_timestamp'),
+                    'metadata': metadata
+                },
+                upsert=True
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not index backup collection {collection_name}: {e}")
+    
+    def _list_backup_collections(self, backup_db):
+        """List backup_db collection names, reusing a listing fetched within the last few seconds"""
+        cached = self._backup_collections_cache
+        if cached is not None and time.monotonic() - cached[0] < self.collection_names_ttl:
+            return cached[1]
+        
+        collection_names = backup_db.list_collection_names()
+        self._backup_collections_cache = (time.monotonic(), collection_names)
+        return collection_names
+    
+    def _load_backup_metadata(self, backup_db, collection_names):
+        """Fetch metadata for many backup collections without one round-trip each"""
+        metadata_by_collection = {}
+        
+        # Indexed backups carry a copy of their metadata, so one find() covers them
+        for index_doc in backup_db[BACKUP_INDEX_COLLECTION].find({'metadata': {'$exists': True}}, {'metadata': 1}):
+            metadata_by_collection[index_doc['_id']] = index_doc['metadata']
+        
+        # Older backups predate the index; probe their metadata documents concurrently
+        unindexed = [name for name in collection_names if name not in metadata_by_collection]
+        if unindexed:
+            def fetch_metadata(collection_name):
+                metadata_doc = backup_db[collection_name].find_one({'_id': 'BACKUP_METADATA'})
+                if metadata_doc and 'metadata' in metadata_doc:
+                    return collection_name, metadata_doc['metadata']
+                return collection_name, None
+            
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(unindexed))) as executor:
+                for collection_name, metadata in executor.map(fetch_metadata, unindexed):
+                    if metadata is not None:
+                        metadata_by_collection[collection_name] = metadata
+        
+        return metadata_by_collection
 
-    def list_database_backups(self):
-        """List all backups stored in the backup database"""
+    def _backup_document_count(self, collection, exact=False):
+        """Count the backed-up documents in a backup collection, leaving out its metadata document"""
+        if exact:
+            return collection.count_documents({'_id': {'$ne': 'BACKUP_METADATA'}})
+        # Estimates come from collection metadata in O(1) rather than scanning the collection
+        return max(collection.estimated_document_count() - 1, 0)
+
+    def list_database_backups(self, exact=False):
+        """List all backups stored in the backup database; exact counts every document instead of using estimates"""
         try:
             backups = []
             
-            with mongo_service.get_client(self.backup_db_connection) as client:
-                backup_db = client['backup_db']
-                collection_names = backup_db.list_collection_names()
+            client = mongo_service.get_bulk_client(self.backup_db_connection)
+            backup_db = client['backup_db']
+            # Skip system collections and the backup index
+            collection_names = [
+                name for name in self._list_backup_collections(backup_db)
+                if not name.startswith(SYSTEM_COLLECTION_PREFIX) and name != BACKUP_INDEX_COLLECTION
+            ]
+            metadata_by_collection = self._load_backup_metadata(backup_db, collection_names)
+            
+            for collection_name in collection_names:
+                collection = backup_db[collection_name]
+                metadata = metadata_by_collection.get(collection_name)
                 
-                for collection_name in collection_names:
-                    # Skip system collections
-                    if collection_name.startswith('system.'):
-                        continue
-                        
-                    collection = backup_db[collection_name]
-                    
-                    # Get metadata document
-                    metadata_doc = collection.find_one({'_id': 'BACKUP_METADATA'})
+                if metadata is not None:
+                    # The backup recorded its document count; only older metadata needs a count round-trip
+                    doc_count = None if exact else metadata.get('total_documents')
+                    if doc_count is None:
+                        doc_count = self._backup_document_count(collection, exact)
                     
-                    if metadata_doc and 'metadata' in metadata_doc:
-                        metadata = metadata_doc['metadata']
-                        
-                        # Get collection size (document count)
-                        doc_count = collection.count_documents({'_id': {'$ne': 'BACKUP_METADATA'}})
-                        
-                        backups.append({
-                            'name': metadata.get('backup_identifier', collection_name),
-                            'database': metadata.get('source_database', 'unknown'),
-                            'size': doc_count,  # Using document count as size
-                            'size_formatted': f"{doc_count} documents",
-                            'created_at': metadata.get('backup_timestamp'),
-                            'method': 'database_storage',
-                            'collection_name': collection_name,
-                            'total_documents': metadata.get('total_documents', doc_count)
-                        })
-                    else:
-                        # Handle collections without metadata (fallback)
-                        doc_count = collection.count_documents({})
-                        backups.append({
-                            'name': collection_name,
-                            'database': 'unknown',
-                            'size': doc_count,
-                            'size_formatted': f"{doc_count} documents",
-                            'created_at': 'unknown',
-                            'method': 'database_storage',
-                            'collection_name': collection_name,
-                            'total_documents': doc_count
-                        })
-            
-            # Sort by creation date (newest first, with unknown dates last)
+                    backups.append({
+                        'name': metadata.get('backup_identifier', collection_name),
+                        'database': metadata.get('source_database', 'unknown'),
+                        'size': doc_count,  # Using document count as size
+                        'size_formatted': f"{doc_count} documents",
+                        'created_at': metadata.get('backup_timestamp'),
+                        'method': 'database_storage',
+                        'collection_name': collection_name,
+                        'total_documents': metadata.get('total_documents', doc_count)
+                    })
+                else:
+                    # Handle collections without metadata (fallback)
+                    doc_count = collection.count_documents({}) if exact else collection.estimated_document_count()
+                    backups.append({
+                        'name': collection_name,
+                        'database': 'unknown',
+                        'size': doc_count,
+                        'size_formatted': f"{doc_count} documents",
+                        'created_at': 'unknown',
+                        'method': 'database_storage',
+                        'collection_name': collection_name,
+                        'total_documents': doc_count
+                    })
+            
+            # Sort by creation date (newest first, with unknown dates last);
+            # sort() calls the key once per backup, so each timestamp is parsed exactly once
             def sort_key(backup):
                 created_at = backup.get('created_at')
                 if created_at and created_at != 'unknown':
                     try:
-                        return datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    except:
+                        parsed = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                    except ValueError:
                         return datetime.min
+                    # Compare everything as naive UTC; mixing aware and naive datetimes raises TypeError
+                    if parsed.tzinfo is not None:
+                        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+                    return parsed
                 return datetime.min
             
             backups.sort(key=sort_key, reverse=True)
@@ -933,138 +2019,112 @@ class BackupService:
     def get_database_backup_info(self, backup_name):
         """Get information about a database backup"""
         try:
-            with mongo_service.get_client(self.backup_db_connection) as client:
-                backup_db = client['backup_db']
-                
-                # Find the backup collection
-                backup_collection = None
-                backup_collection_name = None
-                
-                # First, try to find by exact collection name
-                collection_names = backup_db.list_collection_names()
-                if backup_name in collection_names:
-                    backup_collection_name = backup_name
-                    backup_collection = backup_db[backup_name]
-                else:
-                    # Search for backup by backup_identifier in metadata
-                    for collection_name in collection_names:
-                        if collection_name.startswith('system.'):
-                            continue
-                        
-                        collection = backup_db[collection_name]
-                        metadata_doc = collection.find_one({'_id': 'BACKUP_METADATA'})
-                        
-                        if metadata_doc and 'metadata' in metadata_doc:
-                            metadata = metadata_doc['metadata']
-                            if metadata.get('backup_identifier') == backup_name:
-                                backup_collection = collection
-                                backup_collection_name = collection_name
-                                break
-                
-                if backup_collection is None:
-                    raise FileNotFoundError(f"Database backup '{backup_name}' not found")
-                
-                # Get metadata
-                metadata_doc = backup_collection.find_one({'_id': 'BACKUP_METADATA'})
-                if not metadata_doc or 'metadata' not in metadata_doc:
-                    raise Exception("Backup metadata not found")
-                
-                metadata = metadata_doc['metadata']
-                
-                # Get collection information
-                collections_info = []
-                if 'collections_backed_up' in metadata:
-                    collections_info = [
-                        {
-                            'name': col['name'],
-                            'document_count': col['document_count'],
-                            'type': 'database'
-                        }
-                        for col in metadata['collections_backed_up']
-                    ]
-                
-                backup_info = {
-                    'name': backup_name,
-                    'database': metadata.get('source_database', 'unknown'),
-                    'size': metadata.get('total_documents', 0),
-                    'size_formatted': f"{metadata.get('total_documents', 0)} documents",
-                    'created_at': metadata.get('backup_timestamp'),
-                    'method': metadata.get('backup_method', 'database_storage'),
-                    'collection_name': backup_collection_name,
-                    'type': 'database',
-                    'source': 'database',
-                    'collections': collections_info
-                }
-                
-                # Return dictionary, not jsonify
-                return {
-                    'success': True,
-                    'backup': backup_info
-                }
-                
+            client = mongo_service.get_bulk_client(self.backup_db_connection)
+            backup_db = client['backup_db']
+            
+            # Find the backup collection
+            backup_collection, backup_collection_name = self._find_backup_collection(backup_db, backup_name)
+            
+            if backup_collection is None:
+                raise FileNotFoundError(f"Database backup '{backup_name}' not found")
+            
+            # Get metadata
+            metadata_doc = backup_collection.find_one({'_id': 'BACKUP_METADATA'})
+            if not metadata_doc or 'metadata' not in metadata_doc:
+                raise Exception("Backup metadata not found")
+            
+            metadata = metadata_doc['metadata']
+            
+            # Get collection information
+            collections_info = []
+            if 'collections_backed_up' in metadata:
+                collections_info = [
+                    {
+                        'name': col['name'],
+                        'document_count': col['document_count'],
+                        'type': 'database'
+                    }
+                    for col in metadata['collections_backed_up']
+                ]
+            
+            backup_info = {
+                'name': backup_name,
+                'database': metadata.get('source_database', 'unknown'),
+                'size': metadata.get('total_documents', 0),
+                'size_formatted': f"{metadata.get('total_documents', 0)} documents",
+                'created_at': metadata.get('backup_timestamp'),
+                'method': metadata.get('backup_method', 'database_storage'),
+                'collection_name': backup_collection_name,
+                'type': 'database',
+                'source': 'database',
+                'collections': collections_info
+            }
+            
+            # Return dictionary, not jsonify
+            return {
+                'success': True,
+                'backup': backup_info
+            }
+            
         except Exception as e:
             self.logger.error(f"Failed to get database backup info: {e}")
             raise
     #check for the number of dbs
-    def get_backup_database_info(self):
-        """Get information about the backup database and its collections"""
+    def get_backup_database_info(self, exact=False):
+        """Get information about the backup database and its collections; exact counts every document"""
         try:
-            with mongo_service.get_client(self.backup_db_connection) as client:
-                # Get all databases
-                db_list = client.list_database_names()
-                
-                # Focus on backup_db
-                if 'backup_db' not in db_list:
-                    return {
-                        'success': True,
-                        'backup_database_exists': False,
-                        'connection_string': self.backup_db_connection,
-                        'message': 'backup_db database does not exist yet'
-                    }
-                
-                backup_db = client['backup_db']
-                collection_names = backup_db.list_collection_names()
-                
-                # Get detailed info about each backup collection
-                backup_collections = []
-                total_documents = 0
-                
-                for collection_name in collection_names:
-                    if collection_name.startswith('system.'):
-                        continue
-                    
-                    collection = backup_db[collection_name]
-                    doc_count = collection.count_documents({})
-                    
-                    # Try to get metadata
-                    metadata_doc = collection.find_one({'_id': 'BACKUP_METADATA'})
-                    metadata = {}
-                    if metadata_doc and 'metadata' in metadata_doc:
-                        metadata = metadata_doc['metadata']
-                    
-                    backup_collections.append({
-                        'collection_name': collection_name,
-                        'document_count': doc_count,
-                        'source_database': metadata.get('source_database', 'unknown'),
-                        'backup_timestamp': metadata.get('backup_timestamp', 'unknown'),
-                        'backup_identifier': metadata.get('backup_identifier', collection_name),
-                        'collections_backed_up': len(metadata.get('collections_backed_up', []))
-                    })
-                    
-                    total_documents += doc_count
-                
+            client = mongo_service.get_bulk_client(self.backup_db_connection)
+            # Get all databases
+            db_list = client.list_database_names()
+            
+            # Focus on backup_db
+            if 'backup_db' not in db_list:
                 return {
                     'success': True,
-                    'backup_database_exists': True,
+                    'backup_database_exists': False,
                     'connection_string': self.backup_db_connection,
-                    'database_list': db_list,
-                    'backup_db_info': {
-                        'total_backup_collections': len(backup_collections),
-                        'total_documents': total_documents,
-                        'backup_collections': backup_collections
-                    }
+                    'message': 'backup_db database does not exist yet'
                 }
+            
+            backup_db = client['backup_db']
+            collection_names = [
+                name for name in self._list_backup_collections(backup_db)
+                if not name.startswith(SYSTEM_COLLECTION_PREFIX) and name != BACKUP_INDEX_COLLECTION
+            ]
+            metadata_by_collection = self._load_backup_metadata(backup_db, collection_names)
+            
+            # Get detailed info about each backup collection
+            backup_collections = []
+            total_documents = 0
+            
+            for collection_name in collection_names:
+                collection = backup_db[collection_name]
+                doc_count = collection.count_documents({}) if exact else collection.estimated_document_count()
+                metadata = metadata_by_collection.get(collection_name, {})
+                
+                backup_collections.append({
+                    'collection_name': collection_name,
+                    'document_count': doc_count,
+                    'source_database': metadata.get('source_database', 'unknown'),
+                    'backup_timestamp': metadata.get('backup_timestamp', 'unknown'),
+                    'backup_identifier': metadata.get('backup_identifier', collection_name),
+                    'collections_backed_up': len(metadata.get('collections_backed_up', []))
+                })
                 
+                total_documents += doc_count
+            
+            return {
+                'success': True,
+                'backup_database_exists': True,
+                'connection_string': self.backup_db_connection,
+                'database_list': db_list,
+                'backup_db_info': {
+                    'total_backup_collections': len(backup_collections),
+                    'total_documents': total_documents,
+                    'backup_collections': backup_collections
+                }
+            }
+            
         except Exception as e:
             self.logger.error(f"Failed to get backup database info: {e}")
             raise
@@ -1072,50 +2132,30 @@ class BackupService:
     def delete_database_backup(self, backup_name):
         """Delete a backup from database storage"""
         try:
-            with mongo_service.get_client(self.backup_db_connection) as client:
-                backup_db = client['backup_db']
-                
-                # Find the backup collection
-                backup_collection = None
-                backup_collection_name = None
-                
-                # First, try to find by exact collection name
-                collection_names = backup_db.list_collection_names()
-                if backup_name in collection_names:
-                    backup_collection_name = backup_name
-                    backup_collection = backup_db[backup_name]
-                else:
-                    # Search for backup by backup_identifier in metadata
-                    for collection_name in collection_names:
-                        if collection_name.startswith('system.'):
-                            continue
-                        
-                        collection = backup_db[collection_name]
-                        metadata_doc = collection.find_one({'_id': 'BACKUP_METADATA'})
-                        
-                        if metadata_doc is not None and 'metadata' in metadata_doc:
-                            metadata = metadata_doc['metadata']
-                            if metadata.get('backup_identifier') == backup_name:
-                                backup_collection = collection
-                                backup_collection_name = collection_name
-                                break
-                
-                if backup_collection is None:
-                    raise FileNotFoundError(f"Database backup '{backup_name}' not found")
-                
-                # Delete the backup collection
-                backup_collection.drop()
-                
-                self.logger.info(f"Successfully deleted database backup {backup_name} (collection: {backup_collection_name})")
-                
-                return {
-                    'success': True,
-                    'message': f'Database backup "{backup_name}" deleted successfully',
-                    'backup_name': backup_name,
-                    'collection_name': backup_collection_name,
-                    'source': 'database'
-                }
-                
+            client = mongo_service.get_bulk_client(self.backup_db_connection)
+            backup_db = client['backup_db']
+            
+            # Find the backup collection
+            backup_collection, backup_collection_name = self._find_backup_collection(backup_db, backup_name)
+            
+            if backup_collection is None:
+                raise FileNotFoundError(f"Database backup '{backup_name}' not found")
+            
+            # Delete the backup collection and its index entry
+            backup_collection.drop()
+            self._backup_collections_cache = None
+            backup_db[BACKUP_INDEX_COLLECTION].delete_one({'_id': backup_collection_name})
+            
+            self.logger.info(f"Successfully deleted database backup {backup_name} (collection: {backup_collection_name})")
+            
+            return {
+                'success': True,
+                'message': f'Database backup "{backup_name}" deleted successfully',
+                'backup_name': backup_name,
+                'collection_name': backup_collection_name,
+                'source': 'database'
+            }
+            
         except Exception as e:
             self.logger.error(f"Failed to delete database backup {backup_name}: {e}")
             raise
@@ -1130,8 +2170,7 @@ class BackupService:
             backup_path = self.backup_dir / backup_name
             
             # Extract ZIP file
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                zip_ref.extractall(backup_path)
+            self.extract_zip_archive(file_path, backup_path)
             
             # Process and validate extracted backup
             metadata = self._process_uploaded_backup(backup_path, original_filename, timestamp)
@@ -1147,21 +2186,76 @@ class BackupService:
             self.logger.error(f"Failed to process uploaded backup: {e}")
             # Clean up on failure
             if 'backup_path' in locals() and backup_path.exists():
-                shutil.rmtree(backup_path, ignore_errors=True)
+                self.discard_tree(backup_path)
             raise
 
+    def extract_zip_archive(self, file_path, destination):
+        """Extract a ZIP archive, inflating members on several threads at once"""
+        destination = Path(destination).resolve()
+        destination.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(file_path, 'r') as zip_ref:
+            members = zip_ref.infolist()
+        
+        # Resolve and check every target before extracting anything: members are written concurrently, so two that
+        # land on the same file, or a file where another member needs a directory, would race instead of failing
+        targets = []
+        file_targets = set()
+        directory_targets = set()
+        for member in members:
+            target = (destination / member.filename).resolve()
+            if target != destination and destination not in target.parents:
+                raise ValueError(f"Unsafe path in ZIP archive: {member.filename}")
+            if member.is_dir():
+                directory_targets.add(target)
+            elif target in file_targets:
+                raise ValueError(f"Duplicate entry in ZIP archive: {member.filename}")
+            else:
+                file_targets.add(target)
+            directory_targets.update(itertools.takewhile(lambda parent: parent != destination, target.parents))
+            targets.append((member, target))
+        clashes = file_targets & directory_targets
+        if clashes:
+            raise ValueError(f"ZIP archive uses {min(clashes).relative_to(destination)} as both a file and a directory")
+        
+        def extract_members(shard):
+            # ZipFile handles are not safe to share between threads, so each worker opens its own
+            with zipfile.ZipFile(file_path, 'r') as zip_ref:
+                for member, target in shard:
+                    if member.is_dir():
+                        target.mkdir(parents=True, exist_ok=True)
+                        continue
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    with zip_ref.open(member) as src, open(target, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, FILE_BUFFER_SIZE)
+        
+        # zlib releases the GIL while inflating; deal members out largest first so the shards even out
+        targets.sort(key=lambda pair: pair[0].file_size, reverse=True)
+        workers = max(1, min(self.max_workers, os.cpu_count() or 1, len(targets)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(extract_members, [targets[i::workers] for i in range(workers)]))
+    
+    def _likely_metadata_files(self, backup_path):
+        """Yield metadata.json files at the top level or one directory down, the usual spots in an upload"""
+        candidate = backup_path / 'metadata.json'
+        if candidate.is_file():
+            yield candidate
+        with os.scandir(backup_path) as entries:
+            subdirs = [entry.path for entry in entries if entry.is_dir()]
+        for subdir in subdirs:
+            candidate = Path(subdir) / 'metadata.json'
+            if candidate.is_file():
+                yield candidate
+    
     def _process_uploaded_backup(self, backup_path, original_filename, timestamp):
         """Process and validate uploaded backup structure"""
-        # Look for existing metadata
-        for metadata_file in backup_path.rglob('metadata.json'):
+        # Look for existing metadata, checking where ZIPs normally put it before walking the whole tree
+        for metadata_file in itertools.chain(self._likely_metadata_files(backup_path), backup_path.rglob('metadata.json')):
             try:
-                with open(metadata_file, 'r') as f:
-                    metadata = json.load(f)
+                metadata = load_json_file(metadata_file)
                 # Update metadata with upload info
                 metadata['original_filename'] = original_filename
                 metadata['upload_timestamp'] = timestamp
-                with open(metadata_file, 'w') as f:
-                    json.dump(metadata, f, indent=2)
+                dump_json_file(metadata_file, metadata)
                 return metadata
             except:
                 continue
@@ -1189,8 +2283,7 @@ class BackupService:
         
         # Save metadata
         metadata_file = backup_path / 'metadata.json'
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        dump_json_file(metadata_file, metadata)
         
         return metadata
 
@@ -1,11 +1,101 @@
 from .mongo_service import mongo_service
+from .database_service import database_service
+import os
 import logging
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from utils import validate_database_name, validate_collection_name, validate_connection_string
-from pymongo.errors import CollectionInvalid
+from pymongo import IndexModel
+from pymongo.errors import CollectionInvalid, ExecutionTimeout, OperationFailure, PyMongoError
+from pymongo.write_concern import WriteConcern
+from bson import ObjectId, json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 
 class CollectionService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.copy_workers = int(os.getenv('COPY_WORKERS', 4))  # Parallel _id ranges for a client-side collection copy
+        self.parallel_copy_threshold = int(os.getenv('PARALLEL_COPY_THRESHOLD', 100000))  # Documents before splitting a copy
+    
+    def _collection_exists(self, db, collection_name):
+        """Check for one collection by name; a name-only filter lets the server return at most one entry"""
+        return bool(db.list_collection_names(filter={'name': collection_name}))
+    
+    def _copy_documents(self, source_collection, target_collection):
+        """Copy every document through the client in batches, returning how many were copied"""
+        # Raw documents go back out byte-for-byte without being decoded into Python objects
+        raw_source = source_collection.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+        # The source is the copy's source of truth; don't wait on majority or journal acknowledgement
+        target_collection = target_collection.with_options(write_concern=WriteConcern(w=1, j=False))
+        
+        queries = self._id_range_queries(source_collection)
+        if len(queries) > 1:
+            # Independent _id ranges overlap their network round-trips, each on its own pooled connection
+            with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+                copied_docs = sum(executor.map(
+                    lambda query: self._copy_document_range(raw_source, target_collection, query),
+                    queries
+                ))
+        else:
+            copied_docs = self._copy_document_range(raw_source, target_collection, {})
+        
+        if copied_docs == 0:
+            self.logger.info(f"Source collection {source_collection.name} is empty")
+            # Materialize the empty collection so the indexes below have somewhere to go
+            target_collection.database.create_collection(target_collection.name)
+        
+        return copied_docs
+    
+    def _id_range_queries(self, source_collection):
+        """Split a large collection into _id range queries for a parallel copy, or [{}] to copy it in one pass"""
+        if self.copy_workers < 2 or source_collection.estimated_document_count() < self.parallel_copy_threshold:
+            return [{}]
+        
+        # Sampled _ids approximate quantiles, good enough to give each worker a similar share
+        sampled = source_collection.aggregate([
+            {'$sample': {'size': self.copy_workers - 1}},
+            {'$project': {'_id': 1}}
+        ])
+        bounds = sorted({doc['_id'] for doc in sampled if isinstance(doc['_id'], ObjectId)})
+        if not bounds:
+            return [{}]
+        
+        # Range comparisons only match the bound's BSON type, so anything not keyed by ObjectId gets its own query
+        queries = [{'_id': {'$lt': bounds[0]}}]
+        queries += [{'_id': {'$gte': lo, '$lt': hi}} for lo, hi in zip(bounds, bounds[1:])]
+        queries.append({'_id': {'$gte': bounds[-1]}})
+        queries.append({'_id': {'$not': {'$type': 'objectId'}}})
+        return queries
+    
+    def _copy_document_range(self, source_collection, target_collection, query):
+        """Copy the documents matching query in batches, returning how many were copied"""
+        # Copy documents in batches, with cursor batches to match so each insert needs about one getMore
+        batch_size = 1000
+        copied_docs = 0
+        
+        cursor = source_collection.find(query, batch_size=batch_size)
+        if query:
+            # Walk the range along the _id index rather than letting the planner pick a scan
+            cursor = cursor.hint([('_id', 1)])
+        batch = []
+        
+        for document in cursor:
+            batch.append(document)
+            
+            if len(batch) >= batch_size:
+                # Unordered lets the server apply the batch in parallel; documents were validated on the source
+                target_collection.insert_many(batch, ordered=False, bypass_document_validation=True)
+                copied_docs += len(batch)
+                batch = []
+                self.logger.info(f"Copied {copied_docs} documents")
+        
+        # Insert remaining documents
+        if batch:
+            target_collection.insert_many(batch, ordered=False, bypass_document_validation=True)
+            copied_docs += len(batch)
+        
+        return copied_docs
     
     def list_collections(self, connection_string, database_name):
         """Get list of collections in a database"""
@@ -19,14 +109,22 @@ class CollectionService:
             raise ValueError(message)
         
         try:
-            collections = mongo_service.get_collections(connection_string, database_name)
+            # The entries are produced lazily so the route can stream them; the count is known once they're written
+            collections = mongo_service.iter_collections(connection_string, database_name)
+            
+            def logged_collections():
+                # The listing only finishes (or fails) while the response is being streamed, so log it then
+                try:
+                    yield from collections
+                except Exception as e:
+                    self.logger.error(f"Failed to list collections for database {database_name}: {e}")
+                    raise
+                self.logger.info(f"Successfully listed collections from {database_name}")
             
-            self.logger.info(f"Successfully retrieved {len(collections)} collections from {database_name}")
             return {
                 'success': True,
                 'database': database_name,
-                'collections': collections,
-                'count': len(collections)
+                'collections': logged_collections()
             }
             
         except Exception as e:
@@ -49,57 +147,57 @@ class CollectionService:
             raise ValueError(message)
         
         try:
-            with mongo_service.get_client(connection_string) as client:
-                db = client[database_name]
-                collection = db[collection_name]
-                
-                # Get collection stats
-                stats = db.command('collStats', collection_name)
-                
-                # Get indexes
-                indexes = list(collection.list_indexes())
-                
-                # Get sample documents (first 5)
-                sample_docs = list(collection.find().limit(5))
-                
-                # Convert ObjectId to string for JSON serialization
-                for doc in sample_docs:
-                    if '_id' in doc:
-                        doc['_id'] = str(doc['_id'])
-                
-                result = {
-                    'success': True,
-                    'collection': {
-                        'name': collection_name,
-                        'database': database_name,
-                        'stats': {
-                            'count': stats.get('count', 0),
-                            'size': stats.get('size', 0),
-                            'storageSize': stats.get('storageSize', 0),
-                            'avgObjSize': stats.get('avgObjSize', 0),
-                            'indexCount': stats.get('nindexes', 0),
-                            'totalIndexSize': stats.get('totalIndexSize', 0),
-                            'capped': stats.get('capped', False),
-                            'maxSize': stats.get('maxSize', 0) if stats.get('capped') else None
-                        },
-                        'indexes': [
-                            {
-                                'name': idx.get('name'),
-                                'keys': idx.get('key'),
-                                'unique': idx.get('unique', False),
-                                'sparse': idx.get('sparse', False),
-                                'background': idx.get('background', False),
-                                'expireAfterSeconds': idx.get('expireAfterSeconds')
-                            }
-                            for idx in indexes
-                        ],
-                        'sampleDocuments': sample_docs
-                    }
+            client = mongo_service.get_client(connection_string)
+            db = client[database_name]
+            collection = db[collection_name]
+            
+            # Stats, indexes and sample documents (first 5) are independent reads, so issue them
+            # together on the client's pool and wait for one round trip instead of three
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                stats_future = executor.submit(mongo_service.collection_storage_stats, collection)
+                indexes_future = executor.submit(lambda: list(collection.list_indexes()))
+                sample_future = executor.submit(lambda: list(collection.find().limit(5)))
+                stats = stats_future.result()
+                indexes = indexes_future.result()
+                sample_docs = sample_future.result()
+            
+            # Render every BSON type (ObjectId, Decimal128, datetime, binary...) as relaxed Extended JSON
+            # in one pass through pymongo's encoder, not just the _id field
+            sample_docs = orjson.loads(json_util.dumps(sample_docs, json_options=json_util.RELAXED_JSON_OPTIONS))
+            
+            result = {
+                'success': True,
+                'collection': {
+                    'name': collection_name,
+                    'database': database_name,
+                    'stats': {
+                        'count': stats.get('count', 0),
+                        'size': stats.get('size', 0),
+                        'storageSize': stats.get('storageSize', 0),
+                        'avgObjSize': stats.get('avgObjSize', 0),
+                        'indexCount': stats.get('nindexes', 0),
+                        'totalIndexSize': stats.get('totalIndexSize', 0),
+                        'capped': stats.get('capped', False),
+                        'maxSize': stats.get('maxSize', 0) if stats.get('capped') else None
+                    },
+                    'indexes': [
+                        {
+                            'name': idx.get('name'),
+                            'keys': idx.get('key'),
+                            'unique': idx.get('unique', False),
+                            'sparse': idx.get('sparse', False),
+                            'background': idx.get('background', False),
+                            'expireAfterSeconds': idx.get('expireAfterSeconds')
+                        }
+                        for idx in indexes
+                    ],
+                    'sampleDocuments': sample_docs
                 }
-                
-                self.logger.info(f"Successfully retrieved details for collection {collection_name}")
-                return result
-                
+            }
+            
+            self.logger.info(f"Successfully retrieved details for collection {collection_name}")
+            return result
+            
         except Exception as e:
             self.logger.error(f"Failed to get collection details for {collection_name}: {e}")
             raise
@@ -121,88 +219,101 @@ class CollectionService:
             raise ValueError(message)
         
         target_collection_name = new_collection_name or collection_name
-        is_valid, message = validate_collection_name(target_collection_name)
-        if not is_valid:
-            raise ValueError(f"Invalid target collection name: {message}")
+        # Without a new name the target is the source name, which was just validated
+        if target_collection_name != collection_name:
+            is_valid, message = validate_collection_name(target_collection_name)
+            if not is_valid:
+                raise ValueError(f"Invalid target collection name: {message}")
         
         try:
-            with mongo_service.get_client(connection_string) as client:
-                source_collection = client[source_db][collection_name]
-                target_collection = client[target_db][target_collection_name]
-                
-                # Check if source collection exists
-                if collection_name not in client[source_db].list_collection_names():
-                    raise ValueError(f"Source collection '{collection_name}' does not exist in database '{source_db}'")
-                
-                # Check if target collection already exists
-                if target_collection_name in client[target_db].list_collection_names():
-                    raise ValueError(f"Target collection '{target_collection_name}' already exists in database '{target_db}'")
-                
-                # Get total document count for progress tracking
-                total_docs = source_collection.count_documents({})
-                
-                if total_docs == 0:
-                    self.logger.info(f"Source collection {collection_name} is empty")
-                    # Create empty collection with same indexes
-                    target_collection.insert_one({'_temp': True})
-                    target_collection.delete_one({'_temp': True})
-                else:
-                    # Copy documents in batches
-                    batch_size = 1000
-                    copied_docs = 0
-                    
-                    cursor = source_collection.find()
-                    batch = []
-                    
-                    for document in cursor:
-                        batch.append(document)
-                        
-                        if len(batch) >= batch_size:
-                            target_collection.insert_many(batch)
-                            copied_docs += len(batch)
-                            batch = []
-                            self.logger.info(f"Copied {copied_docs}/{total_docs} documents")
-                    
-                    # Insert remaining documents
-                    if batch:
-                        target_collection.insert_many(batch)
-                        copied_docs += len(batch)
-                
-                # Copy indexes (except _id index)
-                indexes = list(source_collection.list_indexes())
-                copied_indexes = 0
-                
-                for index in indexes:
-                    if index['name'] != '_id_':
-                        try:
-                            index_keys = index['key']
-                            index_options = {k: v for k, v in index.items() if k not in ['key', 'v', 'ns']}
-                            target_collection.create_index(list(index_keys.items()), **index_options)
-                            copied_indexes += 1
-                        except Exception as e:
-                            self.logger.warning(f"Failed to copy index {index['name']}: {e}")
-                
-                result = {
-                    'success': True,
-                    'message': f'Collection copied successfully',
-                    'source': {
-                        'database': source_db,
-                        'collection': collection_name
-                    },
-                    'target': {
-                        'database': target_db,
-                        'collection': target_collection_name
-                    },
-                    'statistics': {
-                        'documentsTotal': total_docs,
-                        'documentsCopied': copied_docs,
-                        'indexesCopied': copied_indexes
+            client = mongo_service.get_client(connection_string)
+            source_collection = client[source_db][collection_name]
+            target_collection = client[target_db][target_collection_name]
+            
+            # Check if source collection exists
+            if not self._collection_exists(client[source_db], collection_name):
+                raise ValueError(f"Source collection '{collection_name}' does not exist in database '{source_db}'")
+            
+            # Check if target collection already exists
+            if self._collection_exists(client[target_db], target_collection_name):
+                raise ValueError(f"Target collection '{target_collection_name}' already exists in database '{target_db}'")
+            
+            # Source and target share a client, so the server can copy the documents itself with $out
+            # (one atomic write, no document data through this process); older servers and sharded
+            # targets reject $out into another database, so fall back to copying through the client
+            try:
+                # A large $out outlasts the client's socket timeout, so give it the long operation limit
+                with mongo_service.long_operation():
+                    source_collection.aggregate(
+                        [{'$out': {'db': target_db, 'coll': target_collection_name}}],
+                        allowDiskUse=True
+                    )
+                copied_docs = target_collection.estimated_document_count()
+            except ExecutionTimeout as e:
+                # The server hit maxTimeMS and aborted; $out only renames its temp collection into place on success
+                raise Exception(f"Copy of {collection_name} was stopped by the server after {mongo_service.long_operation_timeout:.0f}s; no target collection was created") from e
+            except PyMongoError as e:
+                if e.timeout:
+                    # The client stopped waiting, but the server may still finish the $out
+                    self.logger.warning(f"Server-side copy of {collection_name} timed out on the client; it may still complete: {e}")
+                    database_service.invalidate_metadata(connection_string)
+                    return {
+                        'success': True,
+                        'status': 'in_progress',
+                        'message': f'Copy of "{collection_name}" is still running on the server or its outcome is unknown; check "{target_db}.{target_collection_name}" shortly',
+                        'source': {
+                            'database': source_db,
+                            'collection': collection_name
+                        },
+                        'target': {
+                            'database': target_db,
+                            'collection': target_collection_name
+                        }
                     }
+                if not isinstance(e, OperationFailure):
+                    raise
+                self.logger.warning(f"Server-side copy of {collection_name} unavailable, copying through the client: {e}")
+                copied_docs = self._copy_documents(source_collection, target_collection)
+            
+            total_docs = copied_docs
+            
+            # Copy indexes (except _id index) with one createIndexes command, which the server builds
+            # in a single pass over the collection instead of one scan per index
+            index_models = [
+                IndexModel(list(index['key'].items()), **{k: v for k, v in index.items() if k not in ['key', 'v', 'ns']})
+                for index in source_collection.list_indexes()
+                if index['name'] != '_id_'
+            ]
+            copied_indexes = 0
+            if index_models:
+                try:
+                    with mongo_service.long_operation():
+                        copied_indexes = len(target_collection.create_indexes(index_models))
+                except Exception as e:
+                    self.logger.warning(f"Failed to copy indexes of {collection_name}: {e}")
+            
+            result = {
+                'success': True,
+                'message': f'Collection copied successfully',
+                'source': {
+                    'database': source_db,
+                    'collection': collection_name
+                },
+                'target': {
+                    'database': target_db,
+                    'collection': target_collection_name
+                },
+                'statistics': {
+                    'documentsTotal': total_docs,
+                    'documentsCopied': copied_docs,
+                    'indexesCopied': copied_indexes
                 }
-                
-                self.logger.info(f"Successfully copied collection {collection_name} from {source_db} to {target_db}")
-                return result
-                
+            }
+            
+            database_service.invalidate_metadata(connection_string)
+            self.logger.info(f"Successfully copied collection {collection_name} from {source_db} to {target_db}")
+            return result
+            
         except Exception as e:
             self.logger.error(f"Failed to copy collection {collection_name}: {e}")
             raise
@@ -221,47 +332,51 @@ class CollectionService:
         if not collection_names or not isinstance(collection_names, list):
             raise ValueError("Collection names must be provided as a list")
         
-        # Validate collection names
-        for collection_name in collection_names:
+        # Validate collection names, each distinct name once
+        for collection_name in dict.fromkeys(collection_names):
             is_valid, message = validate_collection_name(collection_name)
             if not is_valid:
                 raise ValueError(f"Invalid collection name '{collection_name}': {message}")
         
         try:
-            results = []
+            client = mongo_service.get_client(connection_string)
+            db = client[database_name]
+            # Only ask the server about the requested names rather than listing the whole database
+            existing_collections = set(db.list_collection_names(filter={'name': {'$in': collection_names}}))
             
-            with mongo_service.get_client(connection_string) as client:
-                db = client[database_name]
-                existing_collections = db.list_collection_names()
-                
-                for collection_name in collection_names:
-                    try:
-                        if collection_name not in existing_collections:
-                            results.append({
-                                'collection': collection_name,
-                                'success': False,
-                                'message': f"Collection '{collection_name}' does not exist"
-                            })
-                            continue
-                        
-                        # Drop the collection
-                        db.drop_collection(collection_name)
-                        
-                        results.append({
-                            'collection': collection_name,
-                            'success': True,
-                            'message': f"Collection '{collection_name}' dropped successfully"
-                        })
-                        
-                        self.logger.info(f"Successfully dropped collection {collection_name}")
-                        
-                    except Exception as e:
-                        results.append({
+            def drop_one(collection_name):
+                try:
+                    if collection_name not in existing_collections:
+                        return {
                             'collection': collection_name,
                             'success': False,
-                            'message': f"Failed to drop collection: {str(e)}"
-                        })
-                        self.logger.error(f"Failed to drop collection {collection_name}: {e}")
+                            'message': f"Collection '{collection_name}' does not exist"
+                        }
+                    
+                    # Drop the collection
+                    db.drop_collection(collection_name)
+                    
+                    self.logger.info(f"Successfully dropped collection {collection_name}")
+                    return {
+                        'collection': collection_name,
+                        'success': True,
+                        'message': f"Collection '{collection_name}' dropped successfully"
+                    }
+                    
+                except Exception as e:
+                    self.logger.error(f"Failed to drop collection {collection_name}: {e}")
+                    return {
+                        'collection': collection_name,
+                        'success': False,
+                        'message': f"Failed to drop collection: {str(e)}"
+                    }
+            
+            # Drops of different collections take different collection locks, so issue them concurrently;
+            # map keeps the results in request order
+            with ThreadPoolExecutor(max_workers=min(len(collection_names), 16)) as executor:
+                results = list(executor.map(drop_one, collection_names))
+            
+            database_service.invalidate_metadata(connection_string)
             
             # Calculate summary
             successful = len([r for r in results if r['success']])
@@ -298,27 +413,28 @@ class CollectionService:
             raise ValueError(message)
         
         try:
-            with mongo_service.get_client(connection_string) as client:
-                db = client[database_name]
-                
-                # Check if collection already exists
-                if collection_name in db.list_collection_names():
-                    raise ValueError(f"Collection '{collection_name}' already exists")
-                
-                # Create collection with options
-                if options:
-                    db.create_collection(collection_name, **options)
-                else:
-                    db.create_collection(collection_name)
-                
-                self.logger.info(f"Successfully created collection {collection_name}")
-                return {
-                    'success': True,
-                    'message': f'Collection "{collection_name}" created successfully',
-                    'database': database_name,
-                    'collection': collection_name
-                }
-                
+            client = mongo_service.get_client(connection_string)
+            db = client[database_name]
+            
+            # Check if collection already exists
+            if collection_name in db.list_collection_names():
+                raise ValueError(f"Collection '{collection_name}' already exists")
+            
+            # Create collection with options
+            if options:
+                db.create_collection(collection_name, **options)
+            else:
+                db.create_collection(collection_name)
+            
+            database_service.invalidate_metadata(connection_string)
+            self.logger.info(f"Successfully created collection {collection_name}")
+            return {
+                'success': True,
+                'message': f'Collection "{collection_name}" created successfully',
+                'database': database_name,
+                'collection': collection_name
+            }
+            
         except Exception as e:
             self.logger.error(f"Failed to create collection {collection_name}: {e}")
             raise
@@ -1,10 +1,47 @@
 from .mongo_service import mongo_service
+import os
 import logging
-from utils import validate_database_name, validate_connection_string
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pymongo.errors import OperationFailure
+from utils import validate_database_name, validate_connection_string, connection_string_key
+
+NAMESPACE_EXISTS = 48  # Server error code when a collection is created twice
 
 class DatabaseService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.metadata_ttl = float(os.getenv('DATABASE_METADATA_TTL', 5))  # Seconds a database listing/details result stays fresh
+        self.metadata_cache_size = 256  # Cached results kept before the least recently used is evicted
+        self._metadata_cache = OrderedDict()  # (connection string digest, key) -> (monotonic timestamp, result)
+        self._metadata_cache_lock = threading.Lock()
+    
+    def _cached_metadata(self, connection_string, key, load):
+        """Return a fresh cached result for this connection string and key, or load and cache it"""
+        # The UI polls these read-only endpoints, and each miss costs a round trip per database or collection
+        cache_key = (connection_string_key(connection_string), key)
+        with self._metadata_cache_lock:
+            cached = self._metadata_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < self.metadata_ttl:
+                self._metadata_cache.move_to_end(cache_key)
+                return cached[1]
+        
+        result = load()
+        with self._metadata_cache_lock:
+            self._metadata_cache[cache_key] = (time.monotonic(), result)
+            self._metadata_cache.move_to_end(cache_key)
+            while len(self._metadata_cache) > self.metadata_cache_size:
+                self._metadata_cache.popitem(last=False)
+        return result
+    
+    def invalidate_metadata(self, connection_string):
+        """Forget cached listings and details for a connection string after something changed its databases"""
+        digest = connection_string_key(connection_string)
+        with self._metadata_cache_lock:
+            for cache_key in [k for k in self._metadata_cache if k[0] == digest]:
+                del self._metadata_cache[cache_key]
     
     def test_connection(self, connection_string):
         """Test database connection"""
@@ -15,15 +52,15 @@ class DatabaseService:
         
         return mongo_service.test_connection(connection_string)
     
-    def list_databases(self, connection_string):
-        """Get list of all databases with their information"""
+    def list_databases(self, connection_string, include_stats=True):
+        """Get list of all databases with their information, or just names and sizes when include_stats is False"""
         # Validate connection string
         is_valid, message = validate_connection_string(connection_string)
         if not is_valid:
             raise ValueError(message)
         
-        try:
-            databases = mongo_service.get_databases(connection_string)
+        def load():
+            databases = mongo_service.get_databases(connection_string, include_stats)
             
             # Sort databases by name
             databases.sort(key=lambda x: x['name'])
@@ -34,6 +71,9 @@ class DatabaseService:
                 'databases': databases,
                 'count': len(databases)
             }
+        
+        try:
+            return self._cached_metadata(connection_string, ('list_databases', include_stats), load)
             
         except Exception as e:
             self.logger.error(f"Failed to list databases: {e}")
@@ -50,18 +90,27 @@ class DatabaseService:
         if not is_valid:
             raise ValueError(message)
         
-        try:
-            # Get database info
-            db_info = mongo_service.get_database_info(connection_string, database_name)
-            
-            # Get collections info
-            collections = mongo_service.get_collections(connection_string, database_name)
+        def load():
+            # Database info and the collection listing don't depend on each other, so fetch them concurrently
+            # rather than waiting out dbStats before the listCollections/collStats round trips start
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                info_future = executor.submit(mongo_service.get_database_info, connection_string, database_name)
+                collections_future = executor.submit(mongo_service.get_collections, connection_string, database_name)
+                db_info = info_future.result()
+                collections = collections_future.result()
             
-            # Calculate totals
-            total_documents = sum(col.get('count', 0) for col in collections if col['type'] == 'collection')
-            total_data_size = sum(col.get('size', 0) for col in collections if col['type'] == 'collection')
-            total_storage_size = sum(col.get('storageSize', 0) for col in collections if col['type'] == 'collection')
-            total_index_size = sum(col.get('totalIndexSize', 0) for col in collections if col['type'] == 'collection')
+            # Calculate totals in a single pass over the collections
+            total_collections = total_views = 0
+            total_documents = total_data_size = total_storage_size = total_index_size = 0
+            for col in collections:
+                if col['type'] == 'collection':
+                    total_collections += 1
+                    total_documents += col.get('count', 0)
+                    total_data_size += col.get('size', 0)
+                    total_storage_size += col.get('storageSize', 0)
+                    total_index_size += col.get('totalIndexSize', 0)
+                elif col['type'] == 'view':
+                    total_views += 1
             
             result = {
                 'success': True,
@@ -70,8 +119,8 @@ class DatabaseService:
                     'info': db_info,
                     'collections': collections,
                     'summary': {
-                        'totalCollections': len([c for c in collections if c['type'] == 'collection']),
-                        'totalViews': len([c for c in collections if c['type'] == 'view']),
+                        'totalCollections': total_collections,
+                        'totalViews': total_views,
                         'totalDocuments': total_documents,
                         'totalDataSize': total_data_size,
                         'totalStorageSize': total_storage_size,
@@ -82,6 +131,9 @@ class DatabaseService:
             
             self.logger.info(f"Successfully retrieved details for database {database_name}")
             return result
+        
+        try:
+            return self._cached_metadata(connection_string, ('database_details', database_name), load)
             
         except Exception as e:
             self.logger.error(f"Failed to get database details for {database_name}: {e}")
@@ -99,20 +151,26 @@ class DatabaseService:
             raise ValueError(message)
         
         try:
-            with mongo_service.get_client(connection_string) as client:
-                # Create a temporary collection to force database creation
-                db = client[database_name]
-                temp_collection = db['_temp_collection']
-                temp_collection.insert_one({'temp': True})
-                temp_collection.delete_one({'temp': True})
-                
-                self.logger.info(f"Successfully created database {database_name}")
-                return {
-                    'success': True,
-                    'message': f'Database "{database_name}" created successfully',
-                    'database_name': database_name
-                }
-                
+            client = mongo_service.get_client(connection_string)
+            # Create a temporary collection to force database creation; creating it explicitly
+            # materializes the database in one round trip instead of an insert plus a delete
+            db = client[database_name]
+            # check_exists=False skips pymongo's listCollections pre-check; the server reports a duplicate itself
+            try:
+                db.create_collection('_temp_collection', check_exists=False)
+            except OperationFailure as e:
+                if e.code != NAMESPACE_EXISTS:
+                    raise
+                # Already there from an earlier create, so the database exists too
+            
+            self.invalidate_metadata(connection_string)
+            self.logger.info(f"Successfully created database {database_name}")
+            return {
+                'success': True,
+                'message': f'Database "{database_name}" created successfully',
+                'database_name': database_name
+            }
+            
         except Exception as e:
             self.logger.error(f"Failed to create database {database_name}: {e}")
             raise
@@ -134,22 +192,21 @@ class DatabaseService:
             raise ValueError(f"Cannot drop system database: {database_name}")
         
         try:
-            with mongo_service.get_client(connection_string) as client:
-                # Check if database exists
-                db_list = client.list_database_names()
-                if database_name not in db_list:
-                    raise ValueError(f"Database '{database_name}' does not exist")
-                
-                # Drop the database
-                client.drop_database(database_name)
-                
-                self.logger.info(f"Successfully dropped database {database_name}")
-                return {
-                    'success': True,
-                    'message': f'Database "{database_name}" dropped successfully',
-                    'database_name': database_name
-                }
-                
+            client = mongo_service.get_client(connection_string)
+            # Drop the database; the reply names the database only when there was one to drop,
+            # which replaces a separate listDatabases round trip for the existence check
+            result = client[database_name].command('dropDatabase')
+            if not result.get('dropped'):
+                raise ValueError(f"Database '{database_name}' does not exist")
+            
+            self.invalidate_metadata(connection_string)
+            self.logger.info(f"Successfully dropped database {database_name}")
+            return {
+                'success': True,
+                'message': f'Database "{database_name}" dropped successfully',
+                'database_name': database_name
+            }
+            
         except Exception as e:
             self.logger.error(f"Failed to drop database {database_name}: {e}")
             raise
@@ -1,57 +1,220 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo import MongoClient, timeout as operation_timeout
+from pymongo.errors import ConnectionFailure
 import os
-import logging
+import importlib.util
+import atexit
 from contextlib import contextmanager
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils import connection_string_key
+
+def available_wire_compressors(requested):
+    """Filter a comma-separated compressor list down to the ones pymongo can use here"""
+    # zstd and snappy need optional packages; zlib ships with Python
+    modules = {'zstd': 'zstandard', 'snappy': 'snappy', 'zlib': 'zlib'}
+    available = []
+    for name in (c.strip() for c in requested.split(',')):
+        if name in modules and importlib.util.find_spec(modules[name]) is not None:
+            available.append(name)
+        elif name:
+            logging.getLogger(__name__).warning(f"Wire compressor '{name}' requested but its package is not installed; skipping it")
+    return available
+
+# storageStats fields reported for a collection
+COLLECTION_STAT_FIELDS = ('count', 'size', 'storageSize', 'avgObjSize', 'nindexes', 'totalIndexSize', 'capped', 'maxSize')
 
 class MongoService:
     def __init__(self):
         self.timeout = int(os.getenv('MONGODB_TIMEOUT', 30000))
+        self.max_pool_size = int(os.getenv('MONGODB_MAX_POOL_SIZE', 64))
+        self.min_pool_size = int(os.getenv('MONGODB_MIN_POOL_SIZE', 5))  # Warm sockets kept open per pooled client
+        self.wait_queue_timeout = int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT', 5000))  # ms to wait for a free pooled socket
+        self.long_operation_timeout = float(os.getenv('MONGODB_LONG_OPERATION_TIMEOUT', 4 * 3600))  # Seconds allowed for one server-side copy or index build
         self.logger = logging.getLogger(__name__)
+        self.max_clients = int(os.getenv('MONGODB_MAX_CLIENTS', 32))  # Pooled clients kept at once, least recently used closed first
+        self.client_idle_timeout = float(os.getenv('MONGODB_CLIENT_IDLE_TIMEOUT', 3600))  # Seconds an unused pooled client is kept
+        self._clients = OrderedDict()  # (connection string digest, options) -> [long-lived MongoClient, last use, leases], oldest use first
+        self._clients_lock = threading.Lock()
+        self._lease_scopes = threading.local()  # Per thread: stack of the cache entries leased by each open client_leases block
+        # Backup and restore move whole collections over the wire, so compress it where the server agrees;
+        # every caller shares these options, so each connection string maps to a single pool
+        compressors = available_wire_compressors(os.getenv('MONGODB_COMPRESSORS', 'zstd,snappy,zlib'))
+        self.client_options = {}
+        if compressors:
+            self.client_options = {
+                'compressors': ','.join(compressors),
+                'zlibCompressionLevel': int(os.getenv('MONGODB_ZLIB_COMPRESSION_LEVEL', 3))
+            }
+        atexit.register(self.close_all)
+    
+    def _cached_client(self, key):
+        """Return and lease the pooled client for a cache key, or None when there is none yet"""
+        with self._clients_lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                return None
+            entry[1] = time.monotonic()
+            self._clients.move_to_end(key)
+            self._lease(key, entry)
+            return entry[0]
+    
+    def _new_client(self, connection_string, client_options):
+        """Create a MongoClient with the pooled defaults; client_options override them"""
+        return MongoClient(
+            connection_string,
+            **{
+                'serverSelectionTimeoutMS': self.timeout,
+                'connectTimeoutMS': self.timeout,
+                'socketTimeoutMS': self.timeout,
+                'maxPoolSize': self.max_pool_size,
+                'minPoolSize': self.min_pool_size,
+                'waitQueueTimeoutMS': self.wait_queue_timeout,
+                'retryWrites': True,
+                **client_options
+            }
+        )
+    
+    def _store_client(self, key, client):
+        """Cache and lease a verified client, or return the one another thread cached for the same key meanwhile"""
+        with self._clients_lock:
+            entry = self._clients.get(key)
+            if entry is None:
+                evicted = self._evict_clients(time.monotonic())
+                entry = self._clients[key] = [client, time.monotonic(), 0]
+            else:
+                evicted = [client]
+            entry[1] = time.monotonic()
+            self._clients.move_to_end(key)
+            self._lease(key, entry)
+        
+        for stale_client in evicted:
+            stale_client.close()
+        return entry[0]
+    
+    def _evict_clients(self, now):
+        """Drop unleased clients idle past MONGODB_CLIENT_IDLE_TIMEOUT, then the least recently used until one more fits under MONGODB_MAX_CLIENTS"""
+        # Each client holds its own sockets and monitor threads, so one per connection string ever seen would grow without
+        # bound. Called with the lock held; the caller closes the returned clients after releasing it. A leased client
+        # may be in the middle of an hours-long backup, so it is never closed, even if that leaves the cache over its cap
+        evicted = []
+        excess = len(self._clients) + 1 - self.max_clients
+        for key, (client, last_used, leases) in list(self._clients.items()):
+            if leases:
+                continue
+            if excess > 0 or now - last_used >= self.client_idle_timeout:
+                del self._clients[key]
+                evicted.append(client)
+                excess -= 1
+        return evicted
+    
+    def _lease(self, key, entry):
+        """Count a client as in use by the innermost client_leases block open on this thread, once per block"""
+        scopes = getattr(self._lease_scopes, 'stack', None)
+        if scopes and key not in scopes[-1]:
+            scopes[-1][key] = entry
+            entry[2] += 1
+    
+    def begin_client_leases(self):
+        """Start holding every client this thread fetches until the matching end_client_leases"""
+        if not hasattr(self._lease_scopes, 'stack'):
+            self._lease_scopes.stack = []
+        self._lease_scopes.stack.append({})
+    
+    def end_client_leases(self):
+        """Release the clients leased since the matching begin_client_leases; their idle time starts now"""
+        scopes = getattr(self._lease_scopes, 'stack', None)
+        if not scopes:
+            # A before_request hook that aborted early never began a scope
+            return
+        leased = scopes.pop()
+        now = time.monotonic()
+        with self._clients_lock:
+            for key, entry in leased.items():
+                entry[1] = now
+                entry[2] -= 1
+                # The entry may have been discarded meanwhile; only a cached one moves up the eviction order
+                if self._clients.get(key) is entry:
+                    self._clients.move_to_end(key)
     
     @contextmanager
-    def get_client(self, connection_string):
-        """Context manager for MongoDB client connections"""
-        client = None
+    def client_leases(self):
+        """Keep the clients fetched inside the block from being evicted until the block ends"""
+        self.begin_client_leases()
         try:
-            client = MongoClient(
-                connection_string,
-                serverSelectionTimeoutMS=self.timeout,
-                connectTimeoutMS=self.timeout,
-                socketTimeoutMS=self.timeout
-            )
-            # Test the connection
-            client.admin.command('ping')
-            yield client
+            yield
+        finally:
+            self.end_client_leases()
+    
+    def long_operation(self):
+        """Context manager that gives the enclosed calls MONGODB_LONG_OPERATION_TIMEOUT instead of the client's socket timeout"""
+        # pymongo.timeout replaces socketTimeoutMS for these calls and is also sent as maxTimeMS, so an operation that
+        # runs too long is stopped by the server rather than left running after the client gives up on it
+        return operation_timeout(self.long_operation_timeout)
+    
+    def close_all(self):
+        """Close every pooled client"""
+        with self._clients_lock:
+            clients = [entry[0] for entry in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            client.close()
+    
+    def _get_verified_client(self, connection_string, client_options, check):
+        """Return the pooled client and check(client) when it was just created, or (client, None) when reused"""
+        client_options = {**self.client_options, **client_options}
+        key = (connection_string_key(connection_string), tuple(sorted(client_options.items())))
+        client = self._cached_client(key)
+        if client is not None:
+            return client, None
+        
+        # Creating the client (SRV/TXT lookups for mongodb+srv://) and the first round trip happen outside the
+        # cache lock, so a slow or unreachable host only holds up its own callers
+        client = self._new_client(connection_string, client_options)
+        try:
+            result = check(client)
         except ConnectionFailure as e:
             self.logger.error(f"MongoDB connection failed: {e}")
+            # Don't keep clients for connection strings that never worked
+            client.close()
             raise ConnectionFailure(f"Failed to connect to MongoDB: {str(e)}")
-        except ServerSelectionTimeoutError as e:
-            self.logger.error(f"MongoDB server selection timeout: {e}")
-            raise ServerSelectionTimeoutError(f"MongoDB server selection timeout: {str(e)}")
         except Exception as e:
             self.logger.error(f"Unexpected error during MongoDB connection: {e}")
+            client.close()
             raise
-        finally:
-            if client:
-                client.close()
+        return self._store_client(key, client), result
+    
+    def get_client(self, connection_string, **client_options):
+        """Return the pooled MongoDB client for a connection string and options, checking it with a ping when first created"""
+        # MongoClient is thread-safe and keeps its own connection pool, so callers share it and never close it;
+        # that skips the TCP/TLS handshake and topology discovery per request. close_all runs at exit.
+        client, _ = self._get_verified_client(connection_string, client_options, lambda client: client.admin.command('ping'))
+        return client
+    
+    def get_bulk_client(self, connection_string):
+        """Return the pooled client for backup and restore work, which waits for a free socket instead of timing out"""
+        # Backups nest collection and writer pools, so a burst can queue for sockets longer than MONGODB_WAIT_QUEUE_TIMEOUT
+        return self.get_client(connection_string, waitQueueTimeoutMS=None)
     
     def test_connection(self, connection_string):
         """Test MongoDB connection"""
         try:
-            with self.get_client(connection_string) as client:
-                # Get server info to verify connection
+            # Get server info to verify connection; on a new client it doubles as the first-use check instead of a separate ping
+            client, server_info = self._get_verified_client(connection_string, {}, lambda client: client.server_info())
+            if server_info is None:
                 server_info = client.server_info()
-                self.logger.info(f"Successfully connected to MongoDB {server_info.get('version')}")
-                return {
-                    'success': True,
-                    'message': 'Connection successful',
-                    'server_info': {
-                        'version': server_info.get('version'),
-                        'maxBsonObjectSize': server_info.get('maxBsonObjectSize'),
-                        'maxMessageSizeBytes': server_info.get('maxMessageSizeBytes')
-                    }
+            self.logger.info(f"Successfully connected to MongoDB {server_info.get('version')}")
+            return {
+                'success': True,
+                'message': 'Connection successful',
+                'server_info': {
+                    'version': server_info.get('version'),
+                    'maxBsonObjectSize': server_info.get('maxBsonObjectSize'),
+                    'maxMessageSizeBytes': server_info.get('maxMessageSizeBytes')
                 }
+            }
         except Exception as e:
             self.logger.error(f"Connection test failed: {e}")
             return {
@@ -59,128 +222,185 @@ class MongoService:
                 'message': f'Connection failed: {str(e)}'
             }
     
-    def get_databases(self, connection_string):
-        """Get list of all databases"""
+    def collection_storage_stats(self, collection):
+        """Storage stats for one collection, fetched with $collStats and reduced to the fields the UI shows"""
+        # The collStats command also ships every WiredTiger metric and per-index size; the pipeline keeps them server-side.
+        # $collStats returns one document per shard on a sharded collection, so the counters are summed across them
+        # (a single document passes through unchanged) and the average is recomputed from the totals
+        return next(collection.aggregate([
+            {'$collStats': {'storageStats': {}}},
+            {'$group': {
+                '_id': None,
+                **{field: {'$sum': f'$storageStats.{field}'} for field in ('count', 'size', 'storageSize', 'totalIndexSize')},
+                'nindexes': {'$max': '$storageStats.nindexes'},
+                'capped': {'$max': '$storageStats.capped'},
+                'maxSize': {'$max': '$storageStats.maxSize'}
+            }},
+            {'$project': {
+                '_id': 0,
+                **{field: 1 for field in COLLECTION_STAT_FIELDS if field != 'avgObjSize'},
+                'avgObjSize': {'$cond': [{'$gt': ['$count', 0]}, {'$trunc': {'$divide': ['$size', '$count']}}, 0]}
+            }}
+        ]), {})
+    
+    def _fan_out(self, function, items):
+        """Map a function that makes its own round trips over items on threads, yielding results in input order"""
+        # The pooled client is thread-safe and opens sockets up to maxPoolSize, so the calls overlap instead of queueing
+        if len(items) <= 1:
+            yield from map(function, items)
+            return
+        with ThreadPoolExecutor(max_workers=min(32, len(items), self.max_pool_size)) as executor:
+            yield from executor.map(function, items)
+    
+    def get_databases(self, connection_string, include_stats=True):
+        """Get list of all databases, with dbStats counters unless include_stats is False"""
         try:
-            with self.get_client(connection_string) as client:
-                db_list = client.list_database_names()
-                databases = []
-                
-                for db_name in db_list:
-                    try:
-                        db = client[db_name]
-                        stats = db.command('dbStats')
-                        databases.append({
-                            'name': db_name,
-                            'sizeOnDisk': stats.get('storageSize', 0),
-                            'collections': stats.get('collections', 0),
-                            'views': stats.get('views', 0),
-                            'objects': stats.get('objects', 0),
-                            'avgObjSize': stats.get('avgObjSize', 0),
-                            'dataSize': stats.get('dataSize', 0),
-                            'indexSize': stats.get('indexSize', 0)
-                        })
-                    except Exception as e:
-                        # If we can't get stats, just include basic info
-                        self.logger.warning(f"Could not get stats for database {db_name}: {e}")
-                        databases.append({
-                            'name': db_name,
-                            'sizeOnDisk': 0,
-                            'collections': 0,
-                            'views': 0,
-                            'objects': 0,
-                            'avgObjSize': 0,
-                            'dataSize': 0,
-                            'indexSize': 0
-                        })
-                
+            client = self.get_client(connection_string)
+            # A full listDatabases (not nameOnly) already carries each database's size on disk
+            listing = client.admin.command('listDatabases')['databases']
+            
+            if not include_stats:
+                # Name and size only, from that one round trip
+                databases = [
+                    {'name': entry['name'], 'sizeOnDisk': entry.get('sizeOnDisk', 0), 'empty': entry.get('empty', False)}
+                    for entry in listing
+                ]
                 self.logger.info(f"Retrieved {len(databases)} databases")
                 return databases
-                
+            
+            disk_sizes = {entry['name']: entry.get('sizeOnDisk', 0) for entry in listing}
+            
+            def database_summary(db_name):
+                try:
+                    db = client[db_name]
+                    stats = db.command('dbStats')
+                    return {
+                        'name': db_name,
+                        'sizeOnDisk': stats.get('storageSize', 0),
+                        'collections': stats.get('collections', 0),
+                        'views': stats.get('views', 0),
+                        'objects': stats.get('objects', 0),
+                        'avgObjSize': stats.get('avgObjSize', 0),
+                        'dataSize': stats.get('dataSize', 0),
+                        'indexSize': stats.get('indexSize', 0)
+                    }
+                except Exception as e:
+                    # If we can't get stats, just include basic info
+                    self.logger.warning(f"Could not get stats for database {db_name}: {e}")
+                    return {
+                        'name': db_name,
+                        'sizeOnDisk': disk_sizes[db_name],
+                        'collections': 0,
+                        'views': 0,
+                        'objects': 0,
+                        'avgObjSize': 0,
+                        'dataSize': 0,
+                        'indexSize': 0
+                    }
+            
+            # One dbStats round trip per database, issued concurrently
+            databases = list(self._fan_out(database_summary, list(disk_sizes)))
+            
+            self.logger.info(f"Retrieved {len(databases)} databases")
+            return databases
+            
         except Exception as e:
             self.logger.error(f"Failed to get databases: {e}")
             raise
     
-    def get_collections(self, connection_string, database_name):
-        """Get list of collections in a database"""
-        try:
-            with self.get_client(connection_string) as client:
-                db = client[database_name]
-                
-                # Get collection names and info
-                collections = []
-                collection_names = db.list_collection_names()
-                
-                for collection_name in collection_names:
-                    # Skip system collections
-                    if collection_name.startswith('system.'):
-                        continue
-                        
-                    try:
-                        collection = db[collection_name]
-                        
-                        # Get collection stats
-                        stats = db.command('collStats', collection_name)
-                        
-                        # Get index information
-                        indexes = list(collection.list_indexes())
-                        index_info = []
-                        for index in indexes:
-                            index_info.append({
-                                'name': index.get('name'),
-                                'keys': index.get('key'),
-                                'unique': index.get('unique', False),
-                                'sparse': index.get('sparse', False)
-                            })
-                        
-                        collections.append({
-                            'name': collection_name,
-                            'type': 'collection',
-                            'count': stats.get('count', 0),
-                            'size': stats.get('size', 0),
-                            'storageSize': stats.get('storageSize', 0),
-                            'avgObjSize': stats.get('avgObjSize', 0),
-                            'indexCount': stats.get('nindexes', 0),
-                            'totalIndexSize': stats.get('totalIndexSize', 0),
-                            'indexes': index_info
-                        })
-                        
-                    except Exception as e:
-                        # If we can't get stats, include basic info
-                        self.logger.warning(f"Could not get stats for collection {collection_name}: {e}")
-                        collections.append({
-                            'name': collection_name,
-                            'type': 'collection',
-                            'count': 0,
-                            'size': 0,
-                            'storageSize': 0,
-                            'avgObjSize': 0,
-                            'indexCount': 0,
-                            'totalIndexSize': 0,
-                            'indexes': []
-                        })
+    def iter_collections(self, connection_string, database_name):
+        """Yield the collections and views of a database one entry at a time"""
+        # The listing itself runs before this returns, so connection and permission errors raise to the
+        # caller here; only the per-collection stats are deferred until the entries are consumed
+        client = self.get_client(connection_string)
+        db = client[database_name]
+        
+        # One listCollections round trip gives every name along with its type, so collections and
+        # views are split here rather than asking the server again for the views
+        collection_names = []
+        view_names = []
+        for info in db.list_collections():
+            # Skip system collections
+            if info['name'].startswith('system.'):
+                continue
+            if info.get('type') == 'view':
+                view_names.append(info['name'])
+            else:
+                collection_names.append(info['name'])
+        
+        def collection_summary(collection_name):
+            try:
+                collection = db[collection_name]
                 
-                # Also get views
-                try:
-                    views = db.list_collection_names(filter={'type': 'view'})
-                    for view_name in views:
-                        collections.append({
-                            'name': view_name,
-                            'type': 'view',
-                            'count': 0,
-                            'size': 0,
-                            'storageSize': 0,
-                            'avgObjSize': 0,
-                            'indexCount': 0,
-                            'totalIndexSize': 0,
-                            'indexes': []
-                        })
-                except Exception as e:
-                    self.logger.warning(f"Could not get views for database {database_name}: {e}")
+                # Get collection stats
+                stats = self.collection_storage_stats(collection)
                 
-                self.logger.info(f"Retrieved {len(collections)} collections from database {database_name}")
-                return collections
+                # Get index information
+                indexes = list(collection.list_indexes())
+                index_info = []
+                for index in indexes:
+                    index_info.append({
+                        'name': index.get('name'),
+                        'keys': index.get('key'),
+                        'unique': index.get('unique', False),
+                        'sparse': index.get('sparse', False)
+                    })
                 
+                return {
+                    'name': collection_name,
+                    'type': 'collection',
+                    'count': stats.get('count', 0),
+                    'size': stats.get('size', 0),
+                    'storageSize': stats.get('storageSize', 0),
+                    'avgObjSize': stats.get('avgObjSize', 0),
+                    'indexCount': stats.get('nindexes', 0),
+                    'totalIndexSize': stats.get('totalIndexSize', 0),
+                    'indexes': index_info
+                }
+            
+            except Exception as e:
+                # If we can't get stats, include basic info
+                self.logger.warning(f"Could not get stats for collection {collection_name}: {e}")
+                return {
+                    'name': collection_name,
+                    'type': 'collection',
+                    'count': 0,
+                    'size': 0,
+                    'storageSize': 0,
+                    'avgObjSize': 0,
+                    'indexCount': 0,
+                    'totalIndexSize': 0,
+                    'indexes': []
+                }
+        
+        def entries():
+            # collStats and list_indexes for each collection, with the collections handled concurrently
+            yield from self._fan_out(collection_summary, collection_names)
+            
+            # Views have no storage of their own
+            for view_name in view_names:
+                yield {
+                    'name': view_name,
+                    'type': 'view',
+                    'count': 0,
+                    'size': 0,
+                    'storageSize': 0,
+                    'avgObjSize': 0,
+                    'indexCount': 0,
+                    'totalIndexSize': 0,
+                    'indexes': []
+                }
+        
+        return entries()
+    
+    def get_collections(self, connection_string, database_name):
+        """Get list of collections in a database"""
+        try:
+            collections = list(self.iter_collections(connection_string, database_name))
+            
+            self.logger.info(f"Retrieved {len(collections)} collections from database {database_name}")
+            return collections
+            
         except Exception as e:
             self.logger.error(f"Failed to get collections for database {database_name}: {e}")
             raise
@@ -188,29 +408,29 @@ class MongoService:
     def get_database_info(self, connection_string, database_name):
         """Get detailed information about a specific database"""
         try:
-            with self.get_client(connection_string) as client:
-                db = client[database_name]
-                
-                # Get database stats
-                stats = db.command('dbStats')
-                
-                # Get collection count (excluding system collections)
-                all_collections = db.list_collection_names()
-                collections = [c for c in all_collections if not c.startswith('system.')]
-                
-                return {
-                    'name': database_name,
-                    'collections': len(collections),
-                    'views': stats.get('views', 0),
-                    'objects': stats.get('objects', 0),
-                    'avgObjSize': stats.get('avgObjSize', 0),
-                    'dataSize': stats.get('dataSize', 0),
-                    'storageSize': stats.get('storageSize', 0),
-                    'indexSize': stats.get('indexSize', 0),
-                    'fileSize': stats.get('fileSize', 0),
-                    'nsSizeMB': stats.get('nsSizeMB', 0)
-                }
-                
+            client = self.get_client(connection_string)
+            db = client[database_name]
+            
+            # Get database stats
+            stats = db.command('dbStats')
+            
+            # Get collection count (excluding system collections)
+            all_collections = db.list_collection_names()
+            collections = [c for c in all_collections if not c.startswith('system.')]
+            
+            return {
+                'name': database_name,
+                'collections': len(collections),
+                'views': stats.get('views', 0),
+                'objects': stats.get('objects', 0),
+                'avgObjSize': stats.get('avgObjSize', 0),
+                'dataSize': stats.get('dataSize', 0),
+                'storageSize': stats.get('storageSize', 0),
+                'indexSize': stats.get('indexSize', 0),
+                'fileSize': stats.get('fileSize', 0),
+                'nsSizeMB': stats.get('nsSizeMB', 0)
+            }
+            
         except Exception as e:
             self.logger.error(f"Failed to get database info for {database_name}: {e}")
             raise
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# The server modules import each other as top-level packages (services, utils), as app.py runs them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# backup_service creates its directories on import, so point them somewhere disposable
+_scratch = tempfile.mkdtemp(prefix='db-manager-tests-')
+os.environ.setdefault('BACKUP_DIRECTORY', os.path.join(_scratch, 'backups'))
+os.environ.setdefault('TEMP_DIRECTORY', os.path.join(_scratch, 'temp'))
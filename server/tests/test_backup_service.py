@@ -0,0 +1,90 @@
+import importlib
+import math
+import warnings
+import zipfile
+import pytest
+import bson
+
+# services/__init__ re-exports the instance under the module's name
+backup_service_module = importlib.import_module('services.backup_service')
+
+class FakeDatabase:
+    def create_collection(self, name, **options):
+        pass
+
+class FakeCollection:
+    """The parts of a pymongo Collection that restores touch, recording what gets inserted"""
+    def __init__(self, name='items'):
+        self.name = name
+        self.database = FakeDatabase()
+        self.documents = []
+    
+    def list_indexes(self):
+        return []
+    
+    def options(self):
+        return {}
+    
+    def drop(self):
+        self.documents = []
+    
+    def insert_many(self, documents, **kwargs):
+        self.documents.extend(bson.decode(doc.raw) for doc in documents)
+
+# What json.dump(documents, f, default=str) wrote for non-finite doubles in older backups
+LEGACY_NON_FINITE_BACKUP = b'[{"name": "a", "value": NaN}, {"name": "b", "value": Infinity}, {"name": "c", "value": -Infinity}]'
+
+@pytest.fixture
+def service():
+    return backup_service_module.BackupService()
+
+def test_streamed_json_restore_accepts_legacy_nan(service, tmp_path, monkeypatch):
+    # Force the incremental path that larger files take
+    monkeypatch.setattr(backup_service_module, 'FULL_PARSE_THRESHOLD_BYTES', 0)
+    json_file = tmp_path / 'items.json'
+    json_file.write_bytes(LEGACY_NON_FINITE_BACKUP)
+    collection = FakeCollection()
+    
+    assert service._restore_json_collection(collection, json_file) == 3
+    values = [doc['value'] for doc in collection.documents]
+    assert math.isnan(values[0]) and values[1:] == [math.inf, -math.inf]
+
+def test_streamed_json_restore_keeps_strings_that_mention_nan(service, tmp_path, monkeypatch):
+    monkeypatch.setattr(backup_service_module, 'FULL_PARSE_THRESHOLD_BYTES', 0)
+    json_file = tmp_path / 'items.json'
+    json_file.write_bytes(b'[{"note": "x: NaN", "value": 1.5}]')
+    collection = FakeCollection()
+    
+    assert service._restore_json_collection(collection, json_file) == 1
+    assert collection.documents == [{'note': 'x: NaN', 'value': 1.5}]
+
+def test_small_json_restore_accepts_legacy_nan(service, tmp_path):
+    json_file = tmp_path / 'items.json'
+    json_file.write_bytes(LEGACY_NON_FINITE_BACKUP)
+    collection = FakeCollection()
+    
+    assert service._restore_json_collection(collection, json_file) == 3
+    values = [doc['value'] for doc in collection.documents]
+    assert math.isnan(values[0]) and values[1:] == [math.inf, -math.inf]
+
+def make_zip(path, names):
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name in names:
+            archive.writestr(name, b'data')
+
+def test_zip_extraction_writes_every_member(service, tmp_path):
+    make_zip(tmp_path / 'backup.zip', ['shop/orders.bson', 'shop/items.bson', 'metadata.json'])
+    service.extract_zip_archive(tmp_path / 'backup.zip', tmp_path / 'out')
+    assert (tmp_path / 'out' / 'shop' / 'orders.bson').read_bytes() == b'data'
+
+@pytest.mark.parametrize('names', [
+    ['shop/orders.bson', 'shop/./orders.bson'],
+    ['shop', 'shop/orders.bson'],
+])
+def test_zip_extraction_rejects_clashing_members(service, tmp_path, names):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')  # zipfile warns about the duplicate name itself
+        make_zip(tmp_path / 'backup.zip', names)
+    with pytest.raises(ValueError):
+        service.extract_zip_archive(tmp_path / 'backup.zip', tmp_path / 'out')
+    assert not (tmp_path / 'out' / 'shop' / 'orders.bson').exists()
@@ -0,0 +1,52 @@
+import importlib
+import pytest
+
+# services/__init__ re-exports the instance under the module's name
+mongo_service_module = importlib.import_module('services.mongo_service')
+
+class FakeClient:
+    def __init__(self, connection_string, **options):
+        self.connection_string = connection_string
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(mongo_service_module, 'MongoClient', FakeClient)
+    service = mongo_service_module.MongoService()
+    service.max_clients = 2
+    yield service
+    service.close_all()
+
+def cached(service, name):
+    return service._get_verified_client(f'mongodb://{name}', {}, lambda client: None)[0]
+
+def test_least_recently_used_client_is_evicted(service):
+    a, b = cached(service, 'a'), cached(service, 'b')
+    cached(service, 'a')
+    cached(service, 'c')
+    assert b.closed and not a.closed
+
+def test_leased_client_is_never_evicted(service):
+    with service.client_leases():
+        leased = cached(service, 'a')
+        cached(service, 'b')
+        cached(service, 'c')
+        service.client_idle_timeout = 0
+        cached(service, 'd')
+        assert not leased.closed
+    # Once released its idle time restarts, and it is evictable again
+    cached(service, 'e')
+    assert leased.closed
+
+def test_end_without_begin_is_ignored(service):
+    service.end_client_leases()
+
+def test_client_built_concurrently_for_the_same_key_is_closed(service):
+    key = ('digest', ())
+    first, second = FakeClient('mongodb://a'), FakeClient('mongodb://a')
+    assert service._store_client(key, first) is first
+    assert service._store_client(key, second) is first
+    assert second.closed and not first.closed
@@ -0,0 +1,59 @@
+import math
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from pymongo.errors import (
+    AutoReconnect, BulkWriteError, ConfigurationError, ConnectionFailure, DuplicateKeyError, ExecutionTimeout,
+    NetworkTimeout, OperationFailure, PyMongoError, ServerSelectionTimeoutError, WaitQueueTimeoutError, WriteError
+)
+from utils import OrjsonProvider, handle_error
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    with app.app_context():
+        yield app
+
+@pytest.mark.parametrize('error, status, error_type', [
+    (ServerSelectionTimeoutError('no servers'), 503, 'connection_error'),
+    (ConnectionFailure('refused'), 503, 'connection_error'),
+    (AutoReconnect('reset'), 503, 'connection_error'),
+    (NetworkTimeout('timed out'), 503, 'connection_error'),
+    (WaitQueueTimeoutError('pool exhausted'), 503, 'connection_error'),
+    (OperationFailure('failed'), 400, 'database_error'),
+    (ExecutionTimeout('exceeded time limit'), 400, 'database_error'),
+    (DuplicateKeyError('duplicate key'), 400, 'database_error'),
+    (WriteError('write failed'), 400, 'database_error'),
+    (BulkWriteError({'writeErrors': []}), 400, 'database_error'),
+    (ConfigurationError('bad uri'), 400, 'database_error'),
+    (PyMongoError('generic'), 400, 'database_error'),
+])
+def test_handle_error_status_for_pymongo_errors(app, error, status, error_type):
+    response, status_code = handle_error(error)
+    assert status_code == status
+    assert response.get_json()['type'] == error_type
+
+@pytest.mark.parametrize('error, status', [
+    (ValueError('bad name'), 400),
+    (FileNotFoundError('missing'), 404),
+    (PermissionError('denied'), 403),
+    (RuntimeError('boom'), 500),
+])
+def test_handle_error_status_for_other_errors(app, error, status):
+    assert handle_error(error)[1] == status
+
+@pytest.mark.parametrize('value', [
+    {'created': datetime(2024, 1, 2, 3, 4, 5), 'day': date(2024, 1, 2)},
+    {'big': 2 ** 70, 'negative': -2 ** 70},
+    {'price': Decimal('1.50'), 'nested': [{'b': 1, 'a': 2}]},
+])
+def test_orjson_provider_matches_default_provider(app, value):
+    compact = {'separators': (',', ':')}
+    assert OrjsonProvider(app).dumps(value, **compact) == DefaultJSONProvider(app).dumps(value, **compact)
+
+def test_orjson_provider_loads_what_the_default_provider_accepts(app):
+    loaded = OrjsonProvider(app).loads('{"nan": NaN, "inf": Infinity, "big": 123456789012345678901234567890}')
+    assert math.isnan(loaded['nan']) and loaded['inf'] == math.inf
+    assert loaded['big'] == 123456789012345678901234567890
@@ -1,10 +1,29 @@
 import os
+import atexit
 import logging
+import logging.handlers
+import queue
+import hashlib
 from pathlib import Path
 from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
 from pymongo.errors import PyMongoError, ConnectionFailure, ServerSelectionTimeoutError
 import re
 from datetime import datetime
+import orjson
+
+# Basic MongoDB URI pattern, compiled once rather than looked up on every validation; match() only
+# needs one character after the scheme, so the pattern stops there instead of consuming the whole URI
+MONGODB_URI_PATTERN = re.compile(r'^mongodb(?:\+srv)?://.')
+# MongoDB database name restrictions; the character class finds any of them in one C-level scan
+DATABASE_NAME_INVALID_CHARS = ['/', '\\', '.', '"', '*', '<', '>', ':', '|', '?']
+DATABASE_NAME_INVALID_PATTERN = re.compile('[' + re.escape(''.join(DATABASE_NAME_INVALID_CHARS)) + ']')
+DATABASE_NAME_INVALID_RESULT = (False, f"Database name contains invalid characters: {DATABASE_NAME_INVALID_CHARS}")
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+# Characters not allowed in file names, each mapped to '_'
+FILENAME_SANITIZE_TABLE = str.maketrans({char: '_' for char in '<>:"|?*/\\'})
+
+_log_listener = None  # QueueListener started by setup_logging
 
 def setup_logging():
     """Setup logging configuration"""
@@ -14,14 +33,30 @@ def setup_logging():
     # Create log directory if it doesn't exist
     Path(log_directory).mkdir(parents=True, exist_ok=True)
     
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.FileHandler(os.path.join(log_directory, 'app.log')),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    # Request threads only enqueue records; a listener thread does the file and console writes,
+    # so a slow disk never holds up a request on the handler lock
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Merge args only; the real format is applied by the listener's handlers
+    _log_listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)  # Drain queued records on shutdown
+    
     # Configure logging
     logging.basicConfig(
         level=getattr(logging, log_level),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(os.path.join(log_directory, 'app.log')),
-            logging.StreamHandler()
-        ]
+        handlers=[queue_handler]
     )
 
 def create_directories():
@@ -42,21 +77,23 @@ def validate_connection_string(connection_string):
         return False, "Connection string is required"
     
     # Basic MongoDB URI pattern
-    mongodb_pattern = r'^mongodb(\+srv)?:\/\/.+'
-    if not re.match(mongodb_pattern, connection_string):
+    if not MONGODB_URI_PATTERN.match(connection_string):
         return False, "Invalid MongoDB connection string format"
     
     return True, "Valid connection string"
 
+def connection_string_key(connection_string):
+    """Short digest of a connection string for use as a cache key, so the URI and its credentials aren't kept as keys"""
+    return hashlib.blake2b(connection_string.encode(), digest_size=16).digest()
+
 def validate_database_name(db_name):
     """Validate database name"""
     if not db_name:
         return False, "Database name is required"
     
     # MongoDB database name restrictions
-    invalid_chars = ['/', '\\', '.', '"', '*', '<', '>', ':', '|', '?']
-    if any(char in db_name for char in invalid_chars):
-        return False, f"Database name contains invalid characters: {invalid_chars}"
+    if DATABASE_NAME_INVALID_PATTERN.search(db_name):
+        return DATABASE_NAME_INVALID_RESULT
     
     if len(db_name) > 64:
         return False, "Database name must be 64 characters or less"
@@ -80,71 +117,84 @@ def validate_collection_name(collection_name):
     
     return True, "Valid collection name"
 
+# (error class, (status, error title, message template, type)) pairs; templates may use {error}
+# Checked in order and the first isinstance match wins, as the original if/elif chain did; ServerSelectionTimeoutError
+# is a ConnectionFailure, so a server that is down reports 503 rather than a retryable 408
+ERROR_RESPONSES = (
+    (ConnectionFailure, (503, 'Connection Failed', 'Could not connect to MongoDB. Please check your connection string and network.', 'connection_error')),
+    (ServerSelectionTimeoutError, (408, 'Connection Timeout', 'MongoDB server selection timed out. Please check if the server is running.', 'timeout_error')),
+    (PyMongoError, (400, 'Database Error', 'MongoDB operation failed: {error}', 'database_error')),
+    (ValueError, (400, 'Validation Error', '{error}', 'validation_error')),
+    (FileNotFoundError, (404, 'File Not Found', 'The requested file or backup was not found.', 'file_error')),
+    (PermissionError, (403, 'Permission Error', 'Insufficient permissions to perform this operation.', 'permission_error'))
+)
+SERVER_ERROR_RESPONSE = (500, 'Internal Server Error', 'An unexpected error occurred.', 'server_error')
+
 def handle_error(error):
     """Handle different types of errors and return appropriate response"""
     logging.error(f"Error occurred: {str(error)}")
     
-    if isinstance(error, ConnectionFailure):
-        return jsonify({
-            'error': 'Connection Failed',
-            'message': 'Could not connect to MongoDB. Please check your connection string and network.',
-            'type': 'connection_error'
-        }), 503
-    
-    elif isinstance(error, ServerSelectionTimeoutError):
-        return jsonify({
-            'error': 'Connection Timeout',
-            'message': 'MongoDB server selection timed out. Please check if the server is running.',
-            'type': 'timeout_error'
-        }), 408
-    
-    elif isinstance(error, PyMongoError):
-        return jsonify({
-            'error': 'Database Error',
-            'message': f'MongoDB operation failed: {str(error)}',
-            'type': 'database_error'
-        }), 400
-    
-    elif isinstance(error, ValueError):
-        return jsonify({
-            'error': 'Validation Error',
-            'message': str(error),
-            'type': 'validation_error'
-        }), 400
-    
-    elif isinstance(error, FileNotFoundError):
-        return jsonify({
-            'error': 'File Not Found',
-            'message': 'The requested file or backup was not found.',
-            'type': 'file_error'
-        }), 404
-    
-    elif isinstance(error, PermissionError):
-        return jsonify({
-            'error': 'Permission Error',
-            'message': 'Insufficient permissions to perform this operation.',
-            'type': 'permission_error'
-        }), 403
-    
-    else:
-        return jsonify({
-            'error': 'Internal Server Error',
-            'message': 'An unexpected error occurred.',
-            'type': 'server_error'
-        }), 500
+    response = next((response for error_class, response in ERROR_RESPONSES if isinstance(error, error_class)), SERVER_ERROR_RESPONSE)
+    status, title, message, error_type = response
+    return jsonify({
+        'error': title,
+        'message': message.format(error=str(error)),
+        'type': error_type
+    }), status
 
 def format_bytes(bytes_size):
     """Convert bytes to human readable format"""
     if bytes_size == 0:
         return "0 B"
     
-    sizes = ['B', 'KB', 'MB', 'GB', 'TB']
-    i = 0
-    while bytes_size >= 1024 and i < len(sizes) - 1:
-        bytes_size /= 1024.0
-        i += 1
+    # Each unit is 2**10 of the previous, so the unit index falls straight out of the bit length
+    i = min(max((max(int(bytes_size), 0).bit_length() - 1) // 10, 0), len(BYTE_UNITS) - 1)
     
-    return f"{bytes_size:.2f} {sizes[i]}"
+    return f"{bytes_size / (1 << (10 * i)):.2f} {BYTE_UNITS[i]}"
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson while keeping jsonify's sorted keys, type fallbacks and output"""
+    def dumps(self, obj, **kwargs):
+        # Dates and dataclasses go through Flask's own default as well, so dates stay HTTP dates rather than orjson's ISO 8601
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        try:
+            # Types orjson doesn't handle natively (Decimal, objects with __html__) go through Flask's own default
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        except orjson.JSONEncodeError:
+            # Integers beyond 64 bits, which the standard encoder still writes
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity and integers beyond 64 bits, which the standard parser accepts; invalid JSON fails there too
+            return super().loads(s, **kwargs)
+
+def stream_json_listing(head, list_key, items):
+    """Yield a JSON object in chunks: the head fields, then items written one at a time under list_key, then their count"""
+    # Each item is encoded and sent as it arrives, so the response never holds the whole list in memory
+    opening = orjson.dumps(head)[:-1]
+    yield opening + (b',' if head else b'') + orjson.dumps(list_key) + b':['
+    count = 0
+    for item in items:
+        yield (b',' if count else b'') + orjson.dumps(item, default=str)
+        count += 1
+    yield b'],"count":' + str(count).encode() + b'}'
+
+def load_json_file(path):
+    """Read a JSON file with orjson"""
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def dump_json_file(path, data):
+    """Write data to a JSON file with orjson, indented like the metadata files it replaces"""
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
 def get_backup_filename(db_name, backup_name=None):
     """Generate backup filename with timestamp"""
@@ -155,10 +205,8 @@ def get_backup_filename(db_name, backup_name=None):
 
 def sanitize_filename(filename):
     """Sanitize filename for safe file operations"""
-    # Remove invalid characters for filenames
-    invalid_chars = ['<', '>', ':', '"', '|', '?', '*', '/', '\\']
-    for char in invalid_chars:
-        filename = filename.replace(char, '_')
+    # Replace invalid characters for filenames in a single pass
+    filename = filename.translate(FILENAME_SANITIZE_TABLE)
     
     # Remove leading/trailing spaces and dots
     filename = filename.strip(' .')